@@ -1,5 +1,5 @@
 # c:\xampp\htdocs\smartcapi_pwa\smartcapi-backend\app\api\routes\auth.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
@@ -12,9 +12,15 @@ from ...model.tables import User
 
 router = APIRouter()
 
+def get_user_service(request: Request, db: Session = Depends(get_db)) -> UserService:
+    """One UserService per request, so its user lookups are shared by the whole request."""
+    service = getattr(request.state, "user_service", None)
+    if service is None:
+        service = request.state.user_service = UserService(db)
+    return service
+
 @router.post("/register", response_model=auth_schema.UserResponse)
-def register_user(user: auth_schema.UserCreate, db: Session = Depends(get_db)):
-    user_service = UserService(db)
+def register_user(user: auth_schema.UserCreate, user_service: UserService = Depends(get_user_service)):
     try:
         created_user = user_service.create_user(user)
     except ValueError as e:
@@ -22,8 +28,7 @@ def register_user(user: auth_schema.UserCreate, db: Session = Depends(get_db)):
     return created_user
 
 @router.post("/token", response_model=auth_schema.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user_service = UserService(db)
+def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), user_service: UserService = Depends(get_user_service)):
     user = user_service.authenticate_user(username=form_data.username, password=form_data.password)
     if not user:
         raise HTTPException(
@@ -38,8 +43,7 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/password/forgot")
-def forgot_password(request: auth_schema.PasswordResetRequest, db: Session = Depends(get_db)):
-    user_service = UserService(db)
+def forgot_password(request: auth_schema.PasswordResetRequest, user_service: UserService = Depends(get_user_service)):
     user = user_service.get_user_by_email(request.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -51,8 +55,7 @@ def forgot_password(request: auth_schema.PasswordResetRequest, db: Session = Dep
     return {"message": "Password reset token generated. In a real app, this would be emailed.", "reset_token": token}
 
 @router.post("/password/reset")
-def reset_password(request: auth_schema.PasswordReset, db: Session = Depends(get_db)):
-    user_service = UserService(db)
+def reset_password(request: auth_schema.PasswordReset, user_service: UserService = Depends(get_user_service)):
     user = user_service.get_user_by_password_reset_token(request.token)
     if not user:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
@@ -82,8 +82,7 @@ def retrain_model_task(db: Session):
         registration_service = VoiceRegistrationService(db)
         pending = registration_service.get_pending_retrains()
         
-        for reg in pending:
-            registration_service.mark_retrain_complete(reg['speaker_id'])
+        registration_service.mark_retrain_complete_bulk(reg['speaker_id'] for reg in pending)
         
         # Save metrics to database
         metadata_path = config.METADATA_PATH
@@ -60,8 +60,7 @@ def retrain_model_task():
         train_speaker_model()
         
         # Mark registrations as processed
-        for reg in pending:
-            registration_service.mark_retrain_complete(reg['speaker_id'])
+        registration_service.mark_retrain_complete_bulk(reg['speaker_id'] for reg in pending)
         
         print("Model retraining completed successfully")
         
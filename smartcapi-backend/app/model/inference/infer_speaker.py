@@ -96,6 +96,53 @@ class SpeakerPredictor:
         
         return speaker_id, float(confidence), prob_dict
     
+    def predict_batch(self, segments: np.ndarray,
+                      sr: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Predict speakers for a batch of equal-length segments in one model call.
+        
+        Args:
+            segments: Audio segments, shape (N, T)
+            sr: Sample rate
+        
+        Returns:
+            Tuple of (speaker_ids, confidences, probabilities) arrays. Rows whose
+            features could not be extracted have speaker_id None, confidence NaN
+            and NaN probabilities.
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded")
+        
+        n = len(segments)
+        n_classes = len(self.label_encoder.classes_)
+        speaker_ids = np.full(n, None, dtype=object)
+        confidences = np.full(n, np.nan)
+        probabilities = np.full((n, n_classes), np.nan)
+        
+        # Extract features, skipping segments that fail
+        rows, valid = [], []
+        for i, segment in enumerate(segments):
+            try:
+                rows.append(extract_all_features(segment, sr))
+                valid.append(i)
+            except Exception as e:
+                print(f"Feature extraction failed for segment {i}: {e}")
+        
+        if not rows:
+            return speaker_ids, confidences, probabilities
+        
+        # Scale and predict the whole batch at once
+        features_scaled = self.scaler.transform(np.stack(rows))
+        probs = self.model.predict_proba(features_scaled)
+        best = probs.argmax(axis=1)
+        
+        valid = np.asarray(valid)
+        speaker_ids[valid] = self.label_encoder.inverse_transform(self.model.classes_[best])
+        confidences[valid] = probs[np.arange(len(best)), best]
+        probabilities[valid] = probs
+        
+        return speaker_ids, confidences, probabilities
+    
     def predict_from_file(self, file_path: str, 
                          preprocess: bool = True) -> Tuple[str, float, Dict]:
         """
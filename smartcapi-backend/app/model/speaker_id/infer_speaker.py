@@ -1,21 +1,107 @@
 # model/speaker_id/infer_speaker.py
+import hashlib
 import joblib
 import numpy as np
 import os
+from typing import List
 
 # Build absolute paths to the model and scaler files relative to this script's location
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, "random_forest_model.pkl")
+# Versi .skops (lihat training.train_model.save_model_artifact) dipakai bila ada
+MODEL_PATH = os.path.join(BASE_DIR, "random_forest_model.skops")
+if not os.path.exists(MODEL_PATH):
+    MODEL_PATH = os.path.join(BASE_DIR, "random_forest_model.pkl")
 SCALER_PATH = os.path.join(BASE_DIR, "feature_scaler.pkl")
+# Optional Treelite build of the same trees (training.train_model.export_compiled_model)
+COMPILED_MODEL_PATH = os.path.splitext(MODEL_PATH)[0] + ".so"
 
-# Load model dan scaler
-rf_model = joblib.load(MODEL_PATH)
+# Tipe di luar daftar bawaan skops yang ditulis training.train_model: model
+# HistGradientBoosting beserta loss/binning-nya, LabelEncoder dan skalar numpy.
+# Artefak berisi tipe lain ditolak (UntrustedTypesFoundException).
+_TRUSTED_SKOPS_TYPES = [
+    "sklearn.ensemble._hist_gradient_boosting.gradient_boosting.HistGradientBoostingClassifier",
+    "sklearn.ensemble._hist_gradient_boosting.predictor.TreePredictor",
+    "sklearn.ensemble._hist_gradient_boosting.binning._BinMapper",
+    "sklearn._loss.loss.HalfBinomialLoss",
+    "sklearn._loss.loss.HalfMultinomialLoss",
+    "sklearn._loss.link.LogitLink",
+    "sklearn._loss.link.MultinomialLogit",
+    "sklearn._loss._loss.CyHalfBinomialLoss",
+    "sklearn._loss._loss.CyHalfMultinomialLoss",
+    "sklearn.preprocessing._label.LabelEncoder",
+    "numpy.dtype",
+    "numpy.int32",
+    "numpy.int64",
+    "numpy.float32",
+    "numpy.float64",
+]
+
+def _load_artifact(path: str):
+    if path.endswith(".skops"):
+        import skops.io as sio
+        return sio.load(path, trusted=_TRUSTED_SKOPS_TYPES)
+    return joblib.load(path)
+
+# Load model dan scaler. Model dari train_speaker_model disimpan sebagai
+# {'model', 'classes_'} dan memprediksi indeks label; model lama memprediksi ID langsung.
+_model_artifact = _load_artifact(MODEL_PATH)
+if isinstance(_model_artifact, dict):
+    rf_model = _model_artifact['model']
+    classes = np.asarray(_model_artifact['classes_'])
+else:
+    rf_model = _model_artifact
+    classes = None
 scaler = joblib.load(SCALER_PATH)
 
+def _compiled_model_is_current() -> bool:
+    """Library .so hanya dipakai bila stempelnya cocok dengan file model yang dimuat."""
+    try:
+        with open(COMPILED_MODEL_PATH + ".source") as f:
+            stamp = f.read().strip()
+    except FileNotFoundError:
+        return False
+    with open(MODEL_PATH, "rb") as f:
+        return stamp == hashlib.sha256(f.read()).hexdigest()
+
+compiled_model = None
+if os.path.exists(COMPILED_MODEL_PATH) and _compiled_model_is_current():
+    try:
+        import tl2cgen
+        compiled_model = tl2cgen.Predictor(COMPILED_MODEL_PATH)
+    except ImportError:
+        pass
+
+def _decode_labels(predictions: np.ndarray) -> np.ndarray:
+    return classes[predictions] if classes is not None else predictions
+
+def _predict(mfcc_scaled: np.ndarray) -> np.ndarray:
+    """Prediksi model; lewat library native bila tersedia, hasilnya sama dengan rf_model.predict."""
+    if compiled_model is None:
+        return rf_model.predict(mfcc_scaled)
+    # Probabilitas kelas dari model gradient boosting (softmax atas skor pohon)
+    proba = compiled_model.predict(tl2cgen.DMatrix(np.asarray(mfcc_scaled, dtype=np.float32)))
+    proba = proba.reshape(len(mfcc_scaled), -1)
+    if proba.shape[1] == 1:
+        # Klasifikasi biner: hanya probabilitas kelas positif
+        indices = (proba[:, 0] > 0.5).astype(np.intp)
+    else:
+        indices = np.argmax(proba, axis=1)
+    return rf_model.classes_[indices]
+
 def identify_speaker(mfcc_features: np.ndarray) -> str:
     """
     Menerima array MFCC (33 fitur) dan mengembalikan ID penutur.
     """
     mfcc_scaled = scaler.transform([mfcc_features])
-    speaker_id = rf_model.predict(mfcc_scaled)[0]
+    speaker_id = _decode_labels(_predict(mfcc_scaled))[0]
     return str(speaker_id)
+
+def identify_speakers(mfcc_features: np.ndarray) -> List[str]:
+    """
+    Versi batch dari identify_speaker: satu baris MFCC (33 fitur) per segmen.
+    Semua segmen diprediksi dalam satu panggilan predict (HistGradientBoosting
+    memparalelkannya sendiri dengan OpenMP).
+    """
+    mfcc_scaled = scaler.transform(np.atleast_2d(mfcc_features))
+    speaker_ids = _decode_labels(_predict(mfcc_scaled))
+    return [str(speaker_id) for speaker_id in speaker_ids]
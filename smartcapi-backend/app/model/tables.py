@@ -3,7 +3,7 @@
 import datetime
 import enum
 from sqlalchemy import (Column, Integer, String, Boolean, DateTime, Date, Text,
-                        ForeignKey, Enum as SQLAlchemyEnum, Float, UniqueConstraint)
+                        ForeignKey, Enum as SQLAlchemyEnum, Float, LargeBinary, UniqueConstraint)
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -59,7 +59,8 @@ class PasswordResetToken(Base):
 
     id = Column(Integer, primary_key=True, increment=True)
     user_id = Column(Integer, ForeignKey('users.id'), unique=True)
-    token = Column(String(255), unique=True, nullable=False)
+    # SHA-256 of the token; the plaintext is only ever sent to the user
+    token_hash = Column(LargeBinary(32), unique=True, nullable=False)
     expires_at = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
@@ -110,6 +111,7 @@ class AudioFile(Base):
     id = Column(Integer, primary_key=True, increment=True)
     interview_id = Column(Integer, ForeignKey('interviews.id'))
     file_path = Column(String(255), nullable=False)
+    full_transcript = Column(Text)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     interview = relationship("Interview", back_populates="audio_files")
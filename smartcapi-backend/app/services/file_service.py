@@ -1,14 +1,40 @@
 import shutil
 import hashlib
 import mimetypes
+from collections import Counter
 from pathlib import Path
 from typing import Optional, List, Dict, BinaryIO, Tuple
 from datetime import datetime
 import json
 import uuid
+import queue
+import functools
+import threading
+import atexit
+from concurrent.futures import ThreadPoolExecutor, Future
 import config
 from services.logging_service import get_logger, LogCategory
 
+# Reusable read buffers for streaming hashes (avoids a fresh bytes object per chunk)
+_BUFFER_SIZE = 1 << 20
+_buffer_pool: "queue.LifoQueue[bytearray]" = queue.LifoQueue(maxsize=16)
+
+# Upload hashes are computed off the request path by one pool shared by all
+# FileService instances; queued hashes are finished at interpreter exit
+_hash_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='file_hash')
+atexit.register(_hash_executor.shutdown)
+
+# Upper bound on cached (destination, user_id) -> directory entries
+_DEST_CACHE_SIZE = 1024
+
+# Build the mimetypes DB at import time rather than on the first request
+mimetypes.init()
+
+@functools.lru_cache(maxsize=256)
+def _mime_for_suffix(suffix: str) -> Optional[str]:
+    """Resolve MIME type for a (lowercased) file suffix."""
+    return mimetypes.guess_type('x' + suffix)[0]
+
 class FileType:
     """File type constants."""
     AUDIO = "audio"
@@ -33,9 +59,30 @@ class FileService:
         # Ensure directories exist
         self._ensure_directories()
         
-        # File metadata storage
+        # File metadata storage (loaded lazily on first access)
         self.metadata_file = config.LOGS_DIR / "file_metadata.json"
-        self.file_registry = self._load_file_registry()
+        self._registry = None
+        
+        # Info for unregistered files, keyed by (path, mtime_ns, size)
+        self._file_info_cached = functools.lru_cache(maxsize=1024)(self._compute_file_info)
+        
+        # Resolved (and already created) upload directories
+        self._dest_cache: Dict[Tuple[str, Optional[int]], Path] = {}
+        
+        # Background upload hashes (see _hash_executor) still being computed
+        self._registry_lock = threading.RLock()
+        self._pending_hashes: Dict[str, Future] = {}
+    
+    @property
+    def file_registry(self) -> Dict:
+        """File registry, parsed from JSON on first access."""
+        if self._registry is None:
+            self._registry = self._load_file_registry()
+        return self._registry
+    
+    @file_registry.setter
+    def file_registry(self, value: Dict):
+        self._registry = value
     
     def _ensure_directories(self):
         """Ensure all required directories exist."""
@@ -66,8 +113,26 @@ class FileService:
     
     def _save_file_registry(self):
         """Save file registry to JSON."""
-        with open(self.metadata_file, 'w') as f:
-            json.dump(self.file_registry, f, indent=2)
+        with self._registry_lock:
+            with open(self.metadata_file, 'w') as f:
+                json.dump(self.file_registry, f, indent=2)
+    
+    def _resolve_destination(self, destination: str, user_id: Optional[int]) -> Path:
+        """Resolve an upload directory, creating it only on the first request."""
+        key = (destination, user_id)
+        dest_path = self._dest_cache.get(key)
+        if dest_path is not None:
+            return dest_path
+        
+        if user_id:
+            dest_path = self.uploads_dir / destination / f"user_{user_id}"
+        else:
+            dest_path = self.uploads_dir / destination
+        dest_path.mkdir(parents=True, exist_ok=True)
+        
+        if len(self._dest_cache) < _DEST_CACHE_SIZE:
+            self._dest_cache[key] = dest_path
+        return dest_path
     
     # ==================== FILE UPLOAD ====================
     
@@ -93,12 +158,9 @@ class FileService:
             unique_filename = f"{uuid.uuid4().hex}{file_ext}"
             
             # Determine destination path
-            if user_id and create_subdirs:
-                dest_path = self.uploads_dir / destination / f"user_{user_id}"
-            else:
-                dest_path = self.uploads_dir / destination
-            
-            dest_path.mkdir(parents=True, exist_ok=True)
+            dest_path = self._resolve_destination(
+                destination, user_id if create_subdirs else None
+            )
             
             # Full file path
             file_path = dest_path / unique_filename
@@ -107,14 +169,12 @@ class FileService:
             with open(file_path, 'wb') as f:
                 f.write(file_content)
             
-            # Calculate file hash
-            file_hash = self._calculate_hash(file_content)
-            
-            # Get file info
-            file_info = self._get_file_info(file_path, filename, file_hash, user_id)
+            # Get file info; the hash is filled in by a background worker
+            file_info = self._get_file_info(file_path, filename, None, user_id)
             
             # Register file
             self._register_file(file_path, file_info)
+            self._submit_hash(file_path)
             
             self.logger.info(f"File uploaded: {filename}", LogCategory.FILE,
                            path=str(file_path), size=file_info['size_bytes'])
@@ -124,7 +184,7 @@ class FileService:
                 'file_path': str(file_path),
                 'unique_filename': unique_filename,
                 'original_filename': filename,
-                'file_info': file_info
+                'file_info': self.format_file_info(file_info)
             }
         
         except Exception as e:
@@ -155,12 +215,7 @@ class FileService:
                 raise FileNotFoundError(f"Source file not found: {source_path}")
             
             # Determine destination
-            if user_id:
-                dest_dir = self.uploads_dir / destination / f"user_{user_id}"
-            else:
-                dest_dir = self.uploads_dir / destination
-            
-            dest_dir.mkdir(parents=True, exist_ok=True)
+            dest_dir = self._resolve_destination(destination, user_id)
             dest_path = dest_dir / source.name
             
             # Copy or move
@@ -172,9 +227,7 @@ class FileService:
                 action = "copied"
             
             # Get file info
-            with open(dest_path, 'rb') as f:
-                content = f.read()
-            file_hash = self._calculate_hash(content)
+            file_hash = self._hash_path(dest_path)
             file_info = self._get_file_info(dest_path, source.name, file_hash, user_id)
             
             # Register file
@@ -187,7 +240,7 @@ class FileService:
                 'success': True,
                 'file_path': str(dest_path),
                 'action': action,
-                'file_info': file_info
+                'file_info': self.format_file_info(file_info)
             }
         
         except Exception as e:
@@ -212,14 +265,13 @@ class FileService:
             File content or None
         """
         try:
-            path = Path(file_path)
-            if not path.exists():
-                self.logger.warning(f"File not found: {file_path}", LogCategory.FILE)
-                return None
-            
-            with open(path, mode) as f:
+            with open(file_path, mode) as f:
                 return f.read()
         
+        except FileNotFoundError:
+            self.logger.warning(f"File not found: {file_path}", LogCategory.FILE)
+            return None
+        
         except Exception as e:
             self.logger.error(f"Failed to read file: {file_path}",
                             LogCategory.FILE, exception=e)
@@ -238,22 +290,22 @@ class FileService:
         """
         try:
             path = Path(file_path)
-            if not path.exists():
+            try:
+                if permanent:
+                    path.unlink()
+                    action = "permanently deleted"
+                else:
+                    # Move to temp/deleted directory
+                    deleted_dir = self.temp_dir / "deleted"
+                    deleted_dir.mkdir(parents=True, exist_ok=True)
+                    dest = deleted_dir / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{path.name}"
+                    shutil.move(str(path), str(dest))
+                    action = "moved to trash"
+            except FileNotFoundError:
                 self.logger.warning(f"File not found for deletion: {file_path}",
                                   LogCategory.FILE)
                 return False
             
-            if permanent:
-                path.unlink()
-                action = "permanently deleted"
-            else:
-                # Move to temp/deleted directory
-                deleted_dir = self.temp_dir / "deleted"
-                deleted_dir.mkdir(parents=True, exist_ok=True)
-                dest = deleted_dir / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{path.name}"
-                shutil.move(str(path), str(dest))
-                action = "moved to trash"
-            
             # Remove from registry
             self._unregister_file(path)
             
@@ -282,22 +334,23 @@ class FileService:
             source = Path(source_path)
             dest = Path(destination_path)
             
-            if not source.exists():
-                raise FileNotFoundError(f"Source file not found: {source_path}")
-            
             # Create destination directory
             dest.parent.mkdir(parents=True, exist_ok=True)
             
             # Move file
-            shutil.move(str(source), str(dest))
+            try:
+                shutil.move(str(source), str(dest))
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Source file not found: {source_path}")
             
             # Update registry
-            if str(source) in self.file_registry:
-                file_info = self.file_registry.pop(str(source))
-                file_info['path'] = str(dest)
-                file_info['updated_at'] = datetime.now().isoformat()
-                self.file_registry[str(dest)] = file_info
-                self._save_file_registry()
+            with self._registry_lock:
+                if str(source) in self.file_registry:
+                    file_info = self.file_registry.pop(str(source))
+                    file_info['path'] = str(dest)
+                    file_info['updated_at'] = datetime.now().isoformat()
+                    self.file_registry[str(dest)] = file_info
+                    self._save_file_registry()
             
             self.logger.info(f"File moved: {source.name}", LogCategory.FILE,
                            from_path=str(source), to_path=str(dest))
@@ -315,11 +368,11 @@ class FileService:
             source = Path(source_path)
             dest = Path(destination_path)
             
-            if not source.exists():
-                raise FileNotFoundError(f"Source file not found: {source_path}")
-            
             dest.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(str(source), str(dest))
+            try:
+                shutil.copy2(str(source), str(dest))
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Source file not found: {source_path}")
             
             self.logger.info(f"File copied: {source.name}", LogCategory.FILE,
                            from_path=str(source), to_path=str(dest))
@@ -345,28 +398,33 @@ class FileService:
         """
         try:
             path = Path(file_path)
-            if not path.exists():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
                 return None
             
             # Check registry first
             if str(path) in self.file_registry:
-                return self.file_registry[str(path)]
+                return self.format_file_info(self.file_registry[str(path)])
             
-            # Calculate if not in registry
-            with open(path, 'rb') as f:
-                content = f.read()
-            
-            file_hash = self._calculate_hash(content)
-            return self._get_file_info(path, path.name, file_hash)
+            # Calculate if not in registry; unchanged files hit the cache
+            return self.format_file_info(
+                self._file_info_cached(str(path), st.st_mtime_ns, st.st_size)
+            )
         
         except Exception as e:
             self.logger.error(f"Failed to get file info: {file_path}",
                             LogCategory.FILE, exception=e)
             return None
     
+    def _compute_file_info(self, path_str: str, mtime_ns: int, size: int) -> Dict:
+        """Hash and describe a file; mtime_ns/size only serve as the cache key."""
+        path = Path(path_str)
+        return self._get_file_info(path, path.name, self._hash_path(path))
+    
     def _get_file_info(self, path: Path, original_name: str,
-                       file_hash: str, user_id: Optional[int] = None) -> Dict:
-        """Generate file information dictionary."""
+                       file_hash: Optional[str], user_id: Optional[int] = None) -> Dict:
+        """Generate the compact file information record stored in the registry."""
         stats = path.stat()
         
         return {
@@ -375,15 +433,31 @@ class FileService:
             'filename': path.name,
             'extension': path.suffix,
             'size_bytes': stats.st_size,
-            'size_mb': round(stats.st_size / (1024 * 1024), 2),
-            'created_at': datetime.fromtimestamp(stats.st_ctime).isoformat(),
-            'modified_at': datetime.fromtimestamp(stats.st_mtime).isoformat(),
+            'ctime_ns': stats.st_ctime_ns,
+            'mtime_ns': stats.st_mtime_ns,
             'file_type': self._detect_file_type(path),
-            'mime_type': mimetypes.guess_type(str(path))[0],
+            'mime_type': _mime_for_suffix(path.suffix.lower()),
             'hash': file_hash,
             'user_id': user_id
         }
     
+    def format_file_info(self, info: Dict) -> Dict:
+        """
+        Expand a registry record for API responses.
+        
+        Adds size_mb, created_at and modified_at derived from the stored
+        size_bytes/ctime_ns/mtime_ns. Records written before the compact
+        format already carry these fields and are returned as-is.
+        """
+        result = dict(info)
+        if 'mtime_ns' not in info:
+            return result
+        
+        result['size_mb'] = round(info['size_bytes'] / (1024 * 1024), 2)
+        result['created_at'] = datetime.fromtimestamp(info['ctime_ns'] / 1e9).isoformat()
+        result['modified_at'] = datetime.fromtimestamp(info['mtime_ns'] / 1e9).isoformat()
+        return result
+    
     def _detect_file_type(self, path: Path) -> str:
         """Detect file type from extension."""
         ext = path.suffix.lower()
@@ -414,6 +488,87 @@ class FileService:
         """Calculate SHA-256 hash of file content."""
         return hashlib.sha256(content).hexdigest()
     
+    def _hash_path(self, path: Path) -> str:
+        """Calculate SHA-256 hash of a file by streaming it through a pooled buffer."""
+        try:
+            buf = _buffer_pool.get_nowait()
+        except queue.Empty:
+            buf = bytearray(_BUFFER_SIZE)
+        
+        try:
+            h = hashlib.sha256()
+            mv = memoryview(buf)
+            with open(path, 'rb', buffering=0) as f:
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    h.update(mv[:n])
+            mv.release()
+            return h.hexdigest()
+        finally:
+            try:
+                _buffer_pool.put_nowait(buf)
+            except queue.Full:
+                pass
+    
+    def _backfill_hash(self, path: Path) -> Optional[str]:
+        """
+        Hash an uploaded file and store the result in its registry entry.
+        The registry is not saved; callers write it once for all the hashes
+        they backfill.
+        """
+        try:
+            file_hash = self._hash_path(path)
+            with self._registry_lock:
+                info = self.file_registry.get(str(path))
+                if info is not None:
+                    info['hash'] = file_hash
+            return file_hash
+        
+        except Exception as e:
+            self.logger.error(f"Failed to hash file: {path}",
+                            LogCategory.FILE, exception=e)
+            return None
+    
+    def _hash_upload(self, path: Path) -> Optional[str]:
+        """
+        Background hash of an upload. The registry is saved when the last
+        pending hash finishes, so a burst of uploads costs one write instead
+        of one per file.
+        """
+        try:
+            return self._backfill_hash(path)
+        finally:
+            with self._registry_lock:
+                self._pending_hashes.pop(str(path), None)
+                if not self._pending_hashes:
+                    self._save_file_registry()
+    
+    def _submit_hash(self, path: Path):
+        """Queue a background hash for a registered file."""
+        # Held until the future is recorded so _hash_upload cannot finish first
+        with self._registry_lock:
+            self._pending_hashes[str(path)] = _hash_executor.submit(self._hash_upload, path)
+    
+    def wait_for_hash(self, file_path: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Block until a background hash for the file has been computed.
+        
+        Args:
+            file_path: Path to file
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        
+        Returns:
+            File hash, or None if the file is not registered or hashing failed
+        """
+        future = self._pending_hashes.get(str(file_path))
+        if future is not None:
+            future.result(timeout=timeout)
+        
+        info = self.file_registry.get(str(file_path))
+        return info.get('hash') if info else None
+    
     def verify_file_integrity(self, file_path: str) -> bool:
         """
         Verify file integrity using stored hash.
@@ -428,10 +583,9 @@ class FileService:
             if str(file_path) not in self.file_registry:
                 return False
             
-            stored_hash = self.file_registry[str(file_path)]['hash']
+            stored_hash = self.wait_for_hash(str(file_path))
             
-            with open(file_path, 'rb') as f:
-                current_hash = self._calculate_hash(f.read())
+            current_hash = self._hash_path(Path(file_path))
             
             return stored_hash == current_hash
         
@@ -444,14 +598,16 @@ class FileService:
     
     def _register_file(self, path: Path, file_info: Dict):
         """Register file in registry."""
-        self.file_registry[str(path)] = file_info
-        self._save_file_registry()
+        with self._registry_lock:
+            self.file_registry[str(path)] = file_info
+            self._save_file_registry()
     
     def _unregister_file(self, path: Path):
         """Remove file from registry."""
-        if str(path) in self.file_registry:
-            del self.file_registry[str(path)]
-            self._save_file_registry()
+        with self._registry_lock:
+            if str(path) in self.file_registry:
+                del self.file_registry[str(path)]
+                self._save_file_registry()
     
     def get_registered_files(self, file_type: Optional[str] = None,
                             user_id: Optional[int] = None) -> List[Dict]:
@@ -473,7 +629,7 @@ class FileService:
         if user_id:
             files = [f for f in files if f.get('user_id') == user_id]
         
-        return files
+        return [self.format_file_info(f) for f in files]
     
     # ==================== FILE SEARCH ====================
     
@@ -513,11 +669,31 @@ class FileService:
             return []
     
     def search_by_hash(self, file_hash: str) -> List[str]:
-        """Find files with specific hash (detect duplicates)."""
-        return [
-            path for path, info in self.file_registry.items()
-            if info.get('hash') == file_hash
-        ]
+        """
+        Find files with specific hash (detect duplicates).
+        
+        Waits for uploads still being hashed in the background and hashes
+        registered files that have no hash yet (e.g. an upload whose hash had
+        not finished before a restart), so new uploads are never missed.
+        """
+        for future in list(self._pending_hashes.values()):
+            future.result()
+        
+        with self._registry_lock:
+            unhashed = [
+                path for path, info in self.file_registry.items()
+                if info.get('hash') is None and Path(path).exists()
+            ]
+        for path in unhashed:
+            self._backfill_hash(Path(path))
+        if unhashed:
+            self._save_file_registry()
+        
+        with self._registry_lock:
+            return [
+                path for path, info in self.file_registry.items()
+                if info.get('hash') == file_hash
+            ]
     
     # ==================== DIRECTORY OPERATIONS ====================
     
@@ -553,6 +729,9 @@ class FileService:
             else:
                 dir_path.rmdir()
             
+            # Cached upload directories may no longer exist
+            self._dest_cache.clear()
+            
             self.logger.info(f"Directory deleted: {path}", LogCategory.FILE)
             return True
         
@@ -676,9 +855,9 @@ class FileService:
                 stats['total_files'] += dir_stats['file_count']
         
         # Count by file type
-        for file_info in self.file_registry.values():
-            file_type = file_info.get('file_type', FileType.UNKNOWN)
-            stats['file_types'][file_type] = stats['file_types'].get(file_type, 0) + 1
+        stats['file_types'] = dict(Counter(
+            info.get('file_type', FileType.UNKNOWN) for info in self.file_registry.values()
+        ))
         
         stats['total_size_mb'] = round(stats['total_size_mb'], 2)
         stats['total_size_gb'] = round(stats['total_size_mb'] / 1024, 2)
@@ -704,7 +883,9 @@ class FileService:
         try:
             path = Path(file_path)
             
-            if not path.exists():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
                 return False, "File not found"
             
             # Check extension
@@ -713,7 +894,7 @@ class FileService:
             
             # Check size
             if max_size_mb:
-                file_size_mb = path.stat().st_size / (1024 * 1024)
+                file_size_mb = st.st_size / (1024 * 1024)
                 if file_size_mb > max_size_mb:
                     return False, f"File too large. Maximum size: {max_size_mb}MB"
             
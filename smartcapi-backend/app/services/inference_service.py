@@ -1,27 +1,110 @@
 import numpy as np
-import json
+import logging
+import functools
 from pathlib import Path
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, Future
+from sqlalchemy import func, case
 from sqlalchemy.orm import Session
 # config is a local import, assuming it exists and is correct
 import config 
 # UPDATED IMPORTS
 from app.model.tables import Interview, AudioFile, TranscriptionSegment, UserRole, InterviewStatus
-from utils.audio_utils import load_audio, split_audio, preprocess_audio, save_audio
+from utils.audio_utils import AudioUtils
 # These are local project imports, assuming they are correct
 from inference.infer_speaker import SpeakerPredictor
 from services.whisper_service import WhisperTranscriber
+from services.logging_service import get_logger
+from services.registration_service import read_enumerator_list
 from utils.feature_utils import extract_all_features
 
+logger = logging.getLogger(__name__)
+
+# Speaker type and DB/transcript label, indexed by is_enumerator
+SPEAKER_TYPES = ('respondent', 'enumerator')
+SPEAKER_LABELS = ('RESPONDENT', 'ENUMERATOR')
+
+# Speaker label for segments gated out by VAD
+SILENCE = 'SILENCE'
+
+
+def _file_signature(path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_speaker_predictor(model_signature: tuple) -> SpeakerPredictor:
+    return SpeakerPredictor()
+
+
+def _get_speaker_predictor() -> SpeakerPredictor:
+    """
+    Process-wide speaker model, loaded on first use and reloaded once the
+    model files change on disk, so a retrain (in this process or in the
+    Celery worker) is picked up by the next service.
+    """
+    return _load_speaker_predictor(tuple(
+        _file_signature(path)
+        for path in (config.MODEL_PATH, config.SCALER_PATH, config.METADATA_PATH)
+    ))
+
+
+@functools.lru_cache(maxsize=1)
+def _load_enumerator_ids(list_signature: tuple) -> frozenset:
+    return frozenset(read_enumerator_list(Path(config.ENUMERATOR_LIST_PATH))[0])
+
+
+def _get_enumerator_ids() -> frozenset:
+    """
+    Registered enumerator IDs (snapshot plus change journal), re-read once
+    either file changes so new registrations and retrains are seen.
+    """
+    list_path = Path(config.ENUMERATOR_LIST_PATH)
+    return _load_enumerator_ids((_file_signature(list_path),
+                                 _file_signature(list_path.with_suffix('.jsonl'))))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_transcriber() -> WhisperTranscriber:
+    """Process-wide Whisper model, loaded on first use."""
+    return WhisperTranscriber()
+
+
+@functools.lru_cache(maxsize=4096)
+def _fmt_ts(int_secs: int) -> str:
+    """Format whole seconds as mm:ss."""
+    minutes, secs = divmod(int_secs, 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def reset_model_cache():
+    """Drop cached models; the next service loads both from disk again."""
+    _load_speaker_predictor.cache_clear()
+    _load_enumerator_ids.cache_clear()
+    _get_transcriber.cache_clear()
+
 class InferenceService:
     """Service for complete interview inference pipeline."""
     
     def __init__(self, db: Session = None):
         self.db = db
-        self.speaker_predictor = SpeakerPredictor()
-        self.transcriber = WhisperTranscriber()
-        self.inference_log = config.INFERENCE_LOG
+        # Models are shared across service instances to avoid reloading per request
+        self.speaker_predictor = _get_speaker_predictor()
+        self.transcriber = _get_transcriber()
+        # Inference records go to LoggingService's daily 'inference' JSON log
+        self.log_service = get_logger()
+    
+    @property
+    def _enum_ids(self) -> frozenset:
+        """Registered enumerator IDs for per-segment/group lookups."""
+        return _get_enumerator_ids()
     
     def process_interview_audio(self, interview_id: int, 
                                audio_path: str,
@@ -34,103 +117,87 @@ class InferenceService:
         4. Combine results and save to database.
         """
         try:
-            print(f"Processing interview {interview_id}...")
-            
-            # Step 1: Load and preprocess audio
-            print("Step 1: Loading and preprocessing audio...")
-            audio, sr = preprocess_audio(audio_path)
+            logger.info("Processing interview %s", interview_id)
             
-            # Step 2: Split audio into segments
-            print("Step 2: Splitting audio into segments...")
+            # Steps 1-2: Stream-decode and resample the audio straight into
+            # fixed-stride (N, segment_samples) matrices, one chunk of at most
+            # INFERENCE_CHUNK_DURATION seconds at a time so memory stays
+            # bounded on long recordings; segment i starts at i * segment_duration
             if segment_duration is None:
                 segment_duration = config.AUDIO_DURATION
+            sr = config.SAMPLE_RATE
+            chunks = AudioUtils.iter_segment_matrices(
+                audio_path, sr, segment_duration,
+                chunk_duration=getattr(config, 'INFERENCE_CHUNK_DURATION', 1800)
+            )
             
-            segments = split_audio(audio, sr, segment_duration)
-            print(f"Created {len(segments)} segments")
-            
-            # Step 3: Process each segment
-            print("Step 3: Processing segments...")
-            segment_results = []
+            # Steps 3-5: Identify speakers batch by batch and stream speaker
+            # groups out as soon as they close. Closed groups are transcribed
+            # on a background thread while speaker ID continues. Speaker IDs
+            # come from the registered-speaker classifier, so they are global
+            # and groups from different chunks need no reconciliation.
+            flush_size = getattr(config, 'WHISPER_BATCH_SIZE', 16)
+            grouped_segments = []
+            transcription_futures = []
+            total_segments = 0
             
-            for i, segment in enumerate(segments):
-                try:
-                    # Identify speaker
-                    speaker_id, confidence, _ = self.speaker_predictor.predict_from_audio(segment, sr)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                for segments in chunks:
+                    offset = total_segments
+                    total_segments += len(segments)
+                    ready = []
                     
-                    # Determine speaker type
-                    is_enumerator = self.speaker_predictor.is_enumerator(speaker_id)
-                    speaker_type = 'enumerator' if is_enumerator else 'respondent'
+                    # Groups are closed at chunk edges so each one is a view
+                    # into a single chunk matrix
+                    speaker_batches = self._identify_speakers(segments, sr, offset)
+                    for group in self._stream_groups(speaker_batches, segment_duration):
+                        ready.append(group)
+                        if len(ready) >= flush_size:
+                            transcription_futures.append(self._submit_transcription(
+                                executor, segments, sr, ready, grouped_segments, offset
+                            ))
+                            ready = []
                     
-                    # Calculate timestamps
-                    start_time = i * segment_duration
-                    end_time = start_time + segment_duration
-                    
-                    segment_results.append({
-                        'segment_index': i,
-                        'start_time': start_time,
-                        'end_time': end_time,
-                        'speaker_id': speaker_id,
-                        'speaker_type': speaker_type,
-                        'confidence': confidence,
-                        'audio': segment
-                    })
-                    
-                    print(f"Segment {i}: {speaker_type} (confidence: {confidence:.2f})")
+                    if ready:
+                        transcription_futures.append(self._submit_transcription(
+                            executor, segments, sr, ready, grouped_segments, offset
+                        ))
                 
-                except Exception as e:
-                    print(f"Error processing segment {i}: {e}")
-                    continue
+                transcriptions = [t for future in transcription_futures for t in future.result()]
             
-            # Step 4: Group consecutive segments by speaker (speaker diarization)
-            print("Step 4: Grouping segments by speaker...")
-            grouped_segments = self._group_segments_by_speaker(segment_results)
+            segments_processed = sum(g['end_index'] - g['start_index'] for g in grouped_segments)
             
-            # Step 5: Transcribe grouped segments
-            print("Step 5: Transcribing segments...")
             transcribed_segments = []
-            
-            for group in grouped_segments:
-                try:
-                    # Combine audio from group
-                    combined_audio = np.concatenate([seg['audio'] for seg in group['segments']])
-                    
-                    # Save temporary audio file for transcription
-                    temp_audio_path = config.TEMP_DIR / f"segment_{interview_id}_{group['group_index']}.wav"
-                    save_audio(str(temp_audio_path), combined_audio, sr)
-                    
-                    # Transcribe
-                    transcription = self.transcriber.transcribe(str(temp_audio_path), language='id')
-                    
-                    # Clean up temp file
-                    if temp_audio_path.exists():
-                        temp_audio_path.unlink()
-                    
-                    transcribed_segments.append({
-                        'group_index': group['group_index'],
-                        'speaker_id': group['speaker_id'],
-                        'speaker_type': group['speaker_type'],
-                        'start_time': group['start_time'],
-                        'end_time': group['end_time'],
-                        'confidence': group['avg_confidence'],
-                        'transcript': transcription['text'],
-                        'language': transcription.get('language', 'id')
-                    })
-                    
-                    print(f"Group {group['group_index']}: {group['speaker_type']} - {transcription['text'][:50]}...")
-                
-                except Exception as e:
-                    print(f"Error transcribing group {group['group_index']}: {e}")
+            for group, transcription in zip(grouped_segments, transcriptions):
+                if transcription is None:
                     continue
+                transcribed_segments.append({
+                    'group_index': group['group_index'],
+                    'speaker_id': group['speaker_id'],
+                    'speaker_type': group['speaker_type'],
+                    'speaker_label': group['speaker_label'],
+                    'start_time': group['start_time'],
+                    'end_time': group['end_time'],
+                    'confidence': group['avg_confidence'],
+                    'transcript': transcription['text'],
+                    'language': transcription.get('language', 'id')
+                })
+                
+                logger.debug("Group %d: %s - %.50s", group['group_index'],
+                             group['speaker_type'], transcription['text'])
             
-            # Step 6: Save segments to database (MODIFIED)
-            if self.db:
-                print("Step 6: Saving segments to database...")
-                self._save_segments_to_db(interview_id, audio_path, transcribed_segments)
+            logger.info("Step 3: %d of %d segments grouped into %d speaker groups",
+                        segments_processed, total_segments, len(transcribed_segments))
             
-            # Step 7: Generate full transcript for response
-            print("Step 7: Generating full transcript...")
+            # Step 6: Generate full transcript once; it is stored with the
+            # audio file and returned in the response
             full_transcript = self._generate_full_transcript(transcribed_segments)
             
+            # Step 7: Save segments to database (MODIFIED)
+            if self.db:
+                self._save_segments_to_db(interview_id, audio_path, transcribed_segments,
+                                          full_transcript)
+            
             # Step 8: Update interview record (MODIFIED)
             if self.db:
                 interview = self.db.query(Interview).filter(Interview.id == interview_id).first()
@@ -147,7 +214,7 @@ class InferenceService:
             return {
                 'success': True,
                 'interview_id': interview_id,
-                'segments_processed': len(segment_results),
+                'segments_processed': segments_processed,
                 'transcribed_groups': len(transcribed_segments),
                 'full_transcript': full_transcript,
                 'segments': transcribed_segments
@@ -170,124 +237,215 @@ class InferenceService:
                 'error': str(e)
             }
     
-    def _group_segments_by_speaker(self, segments: List[Dict]) -> List[Dict]:
-        # This method's logic remains the same.
-        if not segments:
-            return []
+    def _submit_transcription(self, executor: ThreadPoolExecutor, segments: np.ndarray,
+                              sr: int, groups: List[Dict], grouped: List[Dict],
+                              offset: int = 0) -> Future:
+        """
+        Number finished speaker groups, append them to grouped and queue their
+        transcription. Groups are contiguous row ranges of the segment matrix
+        (whose first row is global segment offset), so flattening them is a
+        view rather than a concatenated copy.
+        """
+        for group in groups:
+            group['group_index'] = len(grouped)
+            grouped.append(group)
         
-        grouped = []
-        current_group = {
-            'group_index': 0,
-            'speaker_id': segments[0]['speaker_id'],
-            'speaker_type': segments[0]['speaker_type'],
-            'start_time': segments[0]['start_time'],
-            'end_time': segments[0]['end_time'],
-            'segments': [segments[0]],
-            'confidences': [segments[0]['confidence']]
-        }
+        group_audios = [
+            segments[group['start_index'] - offset:group['end_index'] - offset].reshape(-1)
+            for group in groups
+        ]
+        return executor.submit(self._transcribe_groups, groups, group_audios, sr)
+    
+    def _transcribe_groups(self, groups: List[Dict], group_audios: List[np.ndarray],
+                           sr: int) -> List[Optional[Dict]]:
+        """
+        Transcribe one flush of speaker groups. If the batched call fails, the
+        groups are retried one at a time so a single bad clip only loses its
+        own group; groups that still fail come back as None and are skipped.
+        """
+        try:
+            return self.transcriber.transcribe_batch(group_audios, sr, 'id')
+        except Exception as e:
+            logger.warning("Batched transcription of %d groups failed, retrying one by one: %s",
+                           len(groups), e)
+        
+        transcriptions = []
+        for group, audio in zip(groups, group_audios):
+            try:
+                transcriptions.append(self.transcriber.transcribe_array(audio, sr, language='id'))
+            except Exception as e:
+                logger.error("Error transcribing group %d: %s", group['group_index'], e)
+                transcriptions.append(None)
+        return transcriptions
+    
+    def _identify_speakers(self, segments: np.ndarray, sr: int,
+                           offset: int = 0) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """
+        Run speaker ID batch by batch, yielding (batch_start, speaker_ids, confidences).
+        batch_start is a global segment index: row 0 of segments is segment offset.
+        
+        Segments below the VAD energy threshold are not sent to the speaker
+        model and come back labelled SILENCE.
+        """
+        batch_size = getattr(config, 'SPEAKER_BATCH_SIZE', 64)
+        vad_threshold = getattr(config, 'VAD_THRESHOLD', 0.01)
+        for batch_start in range(0, len(segments), batch_size):
+            batch = segments[batch_start:batch_start + batch_size]
+            active = AudioUtils.segment_activity(batch, vad_threshold)
+            
+            speaker_ids = np.full(len(batch), SILENCE, dtype=object)
+            confidences = np.zeros(len(batch), dtype=np.float64)
+            if active.any():
+                ids, confs, _ = self.speaker_predictor.predict_batch(batch[active], sr)
+                speaker_ids[active] = ids
+                confidences[active] = confs
+            yield offset + batch_start, speaker_ids, confidences
+    
+    def _stream_groups(self, speaker_batches: Iterable[Tuple[int, np.ndarray, np.ndarray]],
+                       segment_duration: float) -> Iterator[Dict]:
+        """
+        Group consecutive segments of the same speaker in a single pass.
+        
+        A group is yielded as soon as a speaker change (or a segment without a
+        prediction) closes it. Each group covers the contiguous segment rows
+        [start_index, end_index). Silent segments close the current group and
+        are dropped, so they never reach transcription.
+        """
+        current = None
         
-        for segment in segments[1:]:
-            if segment['speaker_id'] == current_group['speaker_id']:
-                current_group['segments'].append(segment)
-                current_group['confidences'].append(segment['confidence'])
-                current_group['end_time'] = segment['end_time']
-            else:
-                current_group['avg_confidence'] = np.mean(current_group['confidences'])
-                grouped.append(current_group)
+        for batch_start, speaker_ids, confidences in speaker_batches:
+            n = len(speaker_ids)
+            if n == 0:
+                continue
+            
+            # Runs of identical speaker IDs within the batch: [bounds[k], bounds[k + 1])
+            speaker_ids = np.asarray(speaker_ids, dtype=object)
+            changes = np.flatnonzero(speaker_ids[1:] != speaker_ids[:-1]) + 1
+            bounds = np.r_[0, changes, n].tolist()
+            
+            for a, b in zip(bounds[:-1], bounds[1:]):
+                speaker_id = speaker_ids[a]
+                start, end = batch_start + a, batch_start + b
                 
-                current_group = {
-                    'group_index': len(grouped),
-                    'speaker_id': segment['speaker_id'],
-                    'speaker_type': segment['speaker_type'],
-                    'start_time': segment['start_time'],
-                    'end_time': segment['end_time'],
-                    'segments': [segment],
-                    'confidences': [segment['confidence']]
-                }
+                if current is not None and speaker_id != current['speaker_id']:
+                    yield self._close_group(current, segment_duration)
+                    current = None
+                
+                if speaker_id is None:
+                    logger.warning("No speaker prediction for segments %d-%d", start, end - 1)
+                    continue
+                
+                if speaker_id == SILENCE:
+                    continue
+                
+                confidence_sum = float(confidences[a:b].sum())
+                logger.debug("Segments %d-%d: %s (confidence: %.2f)",
+                             start, end - 1, speaker_id, confidence_sum / (b - a))
+                
+                if current is None:
+                    current = {
+                        'speaker_id': speaker_id,
+                        'start_index': start,
+                        'end_index': end,
+                        'confidence_sum': confidence_sum
+                    }
+                else:
+                    # Run continues the group carried over from the previous batch
+                    current['end_index'] = end
+                    current['confidence_sum'] += confidence_sum
         
-        current_group['avg_confidence'] = np.mean(current_group['confidences'])
-        grouped.append(current_group)
+        if current is not None:
+            yield self._close_group(current, segment_duration)
+    
+    def _close_group(self, group: Dict, segment_duration: float) -> Dict:
+        """Fill in speaker type, timestamps and average confidence for a finished group."""
+        count = group['end_index'] - group['start_index']
+        is_enumerator = group['speaker_id'] in self._enum_ids
         
-        return grouped
+        return {
+            'speaker_id': group['speaker_id'],
+            'speaker_type': SPEAKER_TYPES[is_enumerator],
+            'speaker_label': SPEAKER_LABELS[is_enumerator],
+            'start_time': group['start_index'] * segment_duration,
+            'end_time': group['end_index'] * segment_duration,
+            'start_index': group['start_index'],
+            'end_index': group['end_index'],
+            'avg_confidence': group['confidence_sum'] / count
+        }
     
     def _generate_full_transcript(self, segments: List[Dict]) -> str:
-        # This method's logic remains the same.
-        transcript_lines = []
+        return self._format_transcript(
+            [s['start_time'] for s in segments],
+            [s['end_time'] for s in segments],
+            [s['speaker_label'] for s in segments],
+            [s['transcript'] for s in segments]
+        )
+    
+    def _format_transcript(self, starts: List[float], ends: List[float],
+                           labels: List[str], texts: List[str]) -> str:
+        """Render transcript lines, formatting all timestamps in one vectorized pass."""
+        if not texts:
+            return ""
         
-        for segment in segments:
-            speaker_label = "ENUMERATOR" if segment['speaker_type'] == 'enumerator' else "RESPONDENT"
-            timestamp = f"[{self._format_timestamp(segment['start_time'])} - {self._format_timestamp(segment['end_time'])}]"
-            
-            transcript_lines.append(f"{timestamp} {speaker_label}: {segment['transcript']}")
+        # Truncate to whole seconds (seconds >= 0); group boundaries are shared
+        # and stride-aligned, so most stamps are cache hits
+        times = np.concatenate((starts, ends)).astype(np.int64).tolist()
+        stamps = [_fmt_ts(t) for t in times]
+        n = len(texts)
         
-        return "\n\n".join(transcript_lines)
+        return "\n\n".join([
+            f"[{stamps[i]} - {stamps[n + i]}] {labels[i]}: {texts[i]}"
+            for i in range(n)
+        ])
     
     def _format_timestamp(self, seconds: float) -> str:
-        # This method's logic remains the same.
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{minutes:02d}:{secs:02d}"
+        return _fmt_ts(int(seconds))
     
     # REWRITTEN METHOD
-    def _save_segments_to_db(self, interview_id: int, audio_path: str, segments: List[Dict]):
+    def _save_segments_to_db(self, interview_id: int, audio_path: str, segments: List[Dict],
+                             full_transcript: Optional[str] = None):
         """
         Save interview audio file and transcription segments to the database.
+        The rendered transcript is stored on the AudioFile so summaries do not
+        rebuild it from the segments.
         """
+        if full_transcript is None:
+            full_transcript = self._generate_full_transcript(segments)
+        
         try:
             # Step 1: Create the AudioFile record
             audio_file = AudioFile(
                 interview_id=interview_id,
-                file_path=audio_path
+                file_path=audio_path,
+                full_transcript=full_transcript
             )
             self.db.add(audio_file)
             self.db.flush() # Use flush to get the ID before committing
 
-            # Step 2: Create TranscriptionSegment records
-            for segment in segments:
-                # Map speaker_type to the label used in the DB
-                speaker_label = "ENUMERATOR" if segment['speaker_type'] == 'enumerator' else "RESPONDENT"
-
-                db_segment = TranscriptionSegment(
-                    audio_file_id=audio_file.id,
-                    segment_start=segment['start_time'],
-                    segment_end=segment['end_time'],
-                    speaker_label=speaker_label,
-                    transcription_text=segment['transcript']
-                    # 'confidence_score' is not in the new TranscriptionSegment model
-                )
-                self.db.add(db_segment)
+            # Step 2: Insert all TranscriptionSegment rows in one batch
+            rows = [
+                {
+                    'audio_file_id': audio_file.id,
+                    'segment_start': segment['start_time'],
+                    'segment_end': segment['end_time'],
+                    'speaker_label': segment['speaker_label'],
+                    'transcription_text': segment['transcript']
+                }
+                for segment in segments
+            ]
+            self.db.bulk_insert_mappings(TranscriptionSegment, rows)
             
             self.db.commit()
-            print(f"Saved AudioFile and {len(segments)} transcription segments to database.")
+            logger.info("Saved AudioFile and %d transcription segments to database", len(segments))
         
         except Exception as e:
-            print(f"Error saving segments to database: {e}")
+            logger.error("Error saving segments to database: %s", e)
             self.db.rollback() # Rollback on error
 
     def _log_inference(self, interview_id: int, segments_count: int, 
                       status: str, error: str = None):
-        # This method's logic remains the same.
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'interview_id': interview_id,
-            'segments_count': segments_count,
-            'status': status,
-            'error': error
-        }
-        
-        logs = []
-        if self.inference_log.exists():
-            try:
-                with open(self.inference_log, 'r') as f:
-                    logs = json.load(f)
-            except:
-                logs = []
-        
-        logs.append(log_entry)
-        logs = logs[-1000:]
-        
-        with open(self.inference_log, 'w') as f:
-            json.dump(logs, f, indent=2)
+        """Record an inference run in the shared inference log."""
+        self.log_service.log_inference(interview_id, segments_count, status, error=error)
     
     def identify_single_speaker(self, audio_path: str) -> Dict:
         # This method's logic remains the same.
@@ -348,21 +506,24 @@ class InferenceService:
             }
     
     def get_inference_stats(self) -> Dict:
-        # This method's logic remains the same.
-        if not self.inference_log.exists():
-            return {
-                'total_inferences': 0,
-                'successful': 0,
-                'failed': 0,
-                'success_rate': 0.0
-            }
-        
+        """Totals and the latest entries of the inference log."""
         try:
-            with open(self.inference_log, 'r') as f:
-                logs = json.load(f)
+            # Count records still queued in the log writer too
+            self.log_service.flush()
+            
+            total = 0
+            successful = 0
+            recent_logs = deque(maxlen=10)
+            
+            for log in self.log_service.iter_logs('inference'):
+                # The file also holds INFERENCE category messages
+                if 'interview_id' not in log:
+                    continue
+                total += 1
+                if log['status'] == 'success':
+                    successful += 1
+                recent_logs.append(log)
             
-            total = len(logs)
-            successful = sum(1 for log in logs if log['status'] == 'success')
             failed = total - successful
             
             return {
@@ -370,7 +531,7 @@ class InferenceService:
                 'successful': successful,
                 'failed': failed,
                 'success_rate': successful / total if total > 0 else 0.0,
-                'recent_logs': logs[-10:]
+                'recent_logs': list(recent_logs)
             }
         
         except Exception as e:
@@ -387,8 +548,8 @@ class InferenceService:
         try:
             speaker_id, confidence, _ = self.speaker_predictor.predict_from_audio(audio_segment, sr)
             
-            is_enumerator = self.speaker_predictor.is_enumerator(speaker_id)
-            speaker_type = 'enumerator' if is_enumerator else 'respondent'
+            is_enumerator = speaker_id in self._enum_ids
+            speaker_type = SPEAKER_TYPES[is_enumerator]
             
             return {
                 'success': True,
@@ -414,37 +575,58 @@ class InferenceService:
             return {'success': False, 'error': 'Database not available'}
         
         try:
-            interview = self.db.query(Interview).filter(Interview.id == interview_id).first()
-            if not interview:
+            # Interview row plus segment aggregates in one round trip
+            label = TranscriptionSegment.speaker_label
+            row = self.db.query(
+                Interview,
+                func.count(AudioFile.id.distinct()),
+                func.count(TranscriptionSegment.id),
+                func.sum(case((label == SPEAKER_LABELS[True], 1), else_=0)),
+                func.sum(case((label == SPEAKER_LABELS[False], 1), else_=0)),
+                func.max(TranscriptionSegment.segment_end)
+            ).outerjoin(
+                AudioFile, AudioFile.interview_id == Interview.id
+            ).outerjoin(
+                TranscriptionSegment, TranscriptionSegment.audio_file_id == AudioFile.id
+            ).filter(
+                Interview.id == interview_id
+            ).group_by(Interview.id).first()
+
+            if not row:
                 return {'success': False, 'error': 'Interview not found'}
 
-            # Get segments by joining through AudioFile
-            audio_file = self.db.query(AudioFile).filter(AudioFile.interview_id == interview.id).first()
-            if not audio_file:
+            interview, audio_files, total_segments, enumerator_count, respondent_count, max_end = row
+            if not audio_files:
                  return {
                     'success': False,
                     'error': 'Audio file for this interview not found.'
                 }
 
-            segments = self.db.query(TranscriptionSegment).filter(
-                TranscriptionSegment.audio_file_id == audio_file.id
-            ).order_by(TranscriptionSegment.segment_start).all()
+            # Prefer the transcript stored at write time. With several audio
+            # files the stored transcripts are per file, so the interview
+            # transcript is rebuilt from all segment rows (as it is for audio
+            # files saved before the transcript was persisted)
+            transcript_text = None
+            if audio_files == 1:
+                transcript_text = self.db.query(AudioFile.full_transcript).filter(
+                    AudioFile.interview_id == interview_id
+                ).scalar()
 
-            # Generate transcript on-the-fly
-            transcript_text = self._generate_full_transcript_from_db_segments(segments)
-
-            enumerator_segments = [s for s in segments if s.speaker_label == 'ENUMERATOR']
-            respondent_segments = [s for s in segments if s.speaker_label == 'RESPONDENT']
-            
-            total_duration = max([s.segment_end for s in segments]) if segments else 0
+            if transcript_text is None:
+                segments = []
+                if total_segments:
+                    segments = self.db.query(TranscriptionSegment).join(AudioFile).filter(
+                        AudioFile.interview_id == interview_id
+                    ).order_by(TranscriptionSegment.segment_start).all()
+                transcript_text = self._generate_full_transcript_from_db_segments(segments)
             
             summary = {
                 'success': True,
                 'interview_id': interview_id,
-                'total_duration': total_duration,
-                'total_segments': len(segments),
-                'enumerator_segments': len(enumerator_segments),
-                'respondent_segments': len(respondent_segments),
+                'total_duration': max_end or 0,
+                'total_segments': total_segments,
+                'enumerator_segments': enumerator_count or 0,
+                'respondent_segments': respondent_count or 0,
                 'transcript': transcript_text,
                 'start_time': interview.start_time.isoformat(),
                 'end_time': interview.end_time.isoformat() if interview.end_time else None,
@@ -463,11 +645,12 @@ class InferenceService:
         """
         Generate formatted full transcript from database segment objects.
         """
-        transcript_lines = []
-        for segment in segments:
-            timestamp = f"[{self._format_timestamp(segment.segment_start)} - {self._format_timestamp(segment.segment_end)}]"
-            transcript_lines.append(f"{timestamp} {segment.speaker_label}: {segment.transcription_text}")
-        return "\n\n".join(transcript_lines)
+        return self._format_transcript(
+            [s.segment_start for s in segments],
+            [s.segment_end for s in segments],
+            [s.speaker_label for s in segments],
+            [s.transcription_text for s in segments]
+        )
 
 
 def process_interview(interview_id: int, audio_path: str, db: Session = None) -> Dict:
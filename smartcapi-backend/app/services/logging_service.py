@@ -1,13 +1,165 @@
 import logging
+import logging.handlers
 import json
 import csv
+import os
+import mmap
+import queue
+import threading
+import atexit
+import time
+from collections import deque
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Iterable, Iterator
 from enum import Enum
 import traceback
 import sys
 import config
+from utils.json_utils import json_line, json_loads
+from utils.log_files import get_csv_appender
+
+
+def _count_lines(path: Path, chunk_size: int = 1 << 16) -> int:
+    """Count newline-terminated records by scanning raw bytes."""
+    with open(path, 'rb') as f:
+        return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(chunk_size), b''))
+
+
+def _tail_lines(path: Path, n: int) -> List[bytes]:
+    """
+    Last n complete lines of a file, located by scanning backwards for
+    newlines in a read-only mmap so only the tail is ever copied.
+    """
+    with open(path, 'rb') as f:
+        if n <= 0 or os.fstat(f.fileno()).st_size == 0:
+            return []
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            # Ignore a trailing partial line that is still being appended
+            end = m.rfind(b'\n')
+            if end < 0:
+                return []
+            
+            start = end
+            for _ in range(n):
+                start = m.rfind(b'\n', 0, start)
+                if start < 0:
+                    break
+            
+            tail = m[start + 1:end]
+    
+    return [line for line in tail.split(b'\n') if line.strip()]
+
+
+def _format_deferred_traceback(entry: Dict) -> Dict:
+    """Replace an exception deferred in entry['data'] with its formatted traceback."""
+    data = entry.get('data')
+    if isinstance(data, dict) and '_exc' in data:
+        exc = data.pop('_exc')
+        data['traceback'] = ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+    return entry
+
+# Queue sentinel that tells the writer thread to exit
+_STOP = object()
+
+try:
+    _IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+
+
+def _write_all(fd: int, data: bytes):
+    """os.write until every byte of data is written."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _write_buffers(fd: int, buffers: List[bytes]):
+    """Write buffers to fd in as few syscalls as possible (writev where available)."""
+    if not hasattr(os, 'writev'):
+        _write_all(fd, b''.join(buffers))
+        return
+    
+    for start in range(0, len(buffers), _IOV_MAX):
+        chunk = buffers[start:start + _IOV_MAX]
+        written = os.writev(fd, chunk)
+        total = sum(len(buffer) for buffer in chunk)
+        if written < total:
+            # Short write: finish the remainder with plain writes
+            _write_all(fd, b''.join(chunk)[written:])
+
+# io_uring through liburing (Linux only), opt-in with config.LOG_USE_IO_URING; writev otherwise
+try:
+    from liburing import (
+        Ring, Cqe, Iovec, io_uring_queue_init, io_uring_queue_exit, io_uring_get_sqe,
+        io_uring_prep_writev, io_uring_sqe_set_data64, io_uring_submit_and_wait,
+        io_uring_wait_cqe, io_uring_cqe_seen,
+    )
+except ImportError:
+    Ring = None
+
+
+class _UringWriter:
+    """
+    Writes the pending buffers of many files with one io_uring submission:
+    one writev SQE per file, a single io_uring_enter to submit them and wait
+    for every completion, instead of one writev syscall per file.
+    """
+    
+    def __init__(self, entries: int = 256):
+        self.entries = entries
+        self.ring = Ring()
+        self.cqe = Cqe()
+        io_uring_queue_init(entries, self.ring)
+    
+    def write(self, groups: List[tuple]) -> Dict[int, OSError]:
+        """
+        Write each (fd, buffers) group. Returns the errors by group index;
+        the other groups are fully written.
+        """
+        errors = {}
+        for start in range(0, len(groups), self.entries):
+            errors.update(self._submit(groups[start:start + self.entries], start))
+        return errors
+    
+    def _submit(self, groups: List[tuple], base: int) -> Dict[int, OSError]:
+        # Iovec only holds pointers: the buffer lists must stay referenced
+        # until their completions are reaped
+        inflight = []
+        for index, (fd, buffers) in enumerate(groups):
+            if len(buffers) > _IOV_MAX:
+                buffers = [b''.join(buffers)]
+            iov = Iovec(buffers)
+            sqe = io_uring_get_sqe(self.ring)
+            io_uring_prep_writev(sqe, fd, iov)
+            io_uring_sqe_set_data64(sqe, index)
+            inflight.append((buffers, iov))
+        
+        io_uring_submit_and_wait(self.ring, len(inflight))
+        
+        errors = {}
+        for _ in range(len(inflight)):
+            io_uring_wait_cqe(self.ring, self.cqe)
+            completion = self.cqe[0]
+            index, res = completion.user_data, completion.res
+            io_uring_cqe_seen(self.ring, completion)
+            
+            buffers = inflight[index][0]
+            try:
+                if res < 0:
+                    raise OSError(-res, os.strerror(-res))
+                total = sum(len(buffer) for buffer in buffers)
+                if res < total:
+                    # Short write: finish the remainder with plain writes
+                    _write_all(groups[index][0], b''.join(buffers)[res:])
+            except OSError as e:
+                errors[base + index] = e
+        return errors
+    
+    def close(self):
+        io_uring_queue_exit(self.ring)
 
 class LogLevel(Enum):
     """Log level enumeration."""
@@ -29,6 +181,117 @@ class LogCategory(Enum):
     FILE = "file"
     WEBSOCKET = "websocket"
 
+class _AsyncLogWriter(threading.Thread):
+    """
+    Background thread that performs all log-file writes.
+    
+    Producers enqueue (kind, path, payload) records without blocking, or
+    several records as one queue item with submit_many; the thread drains
+    up to batch_size records at a time and hands them to write_batch.
+    Buffered file output is flushed via flush_files every batch_size
+    records or flush_interval seconds, whichever comes first. Records are
+    dropped, and counted, when the queue is full.
+    """
+    
+    def __init__(self, write_batch, flush_files, maxsize: int = 20000,
+                 batch_size: int = 512, flush_interval: float = 0.1):
+        super().__init__(name='smartcapi-log-writer', daemon=True)
+        self._write_batch = write_batch
+        self._flush_files = flush_files
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+    
+    def submit(self, kind: str, path: Path, payload: Any):
+        """Queue a record for writing; never blocks the caller."""
+        try:
+            self._queue.put_nowait((kind, path, payload))
+        except queue.Full:
+            self.dropped += 1
+    
+    def submit_many(self, records: tuple):
+        """Queue several (kind, path, payload) records as one queue item."""
+        try:
+            self._queue.put_nowait(('many', None, records))
+        except queue.Full:
+            self.dropped += len(records)
+    
+    def run(self):
+        running = True
+        unflushed = 0
+        last_flush = time.monotonic()
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                # Idle: push out whatever is still buffered
+                if unflushed:
+                    self._flush_files()
+                    unflushed = 0
+                last_flush = time.monotonic()
+                continue
+            
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            items = [item for item in batch if item is not _STOP]
+            running = len(items) == len(batch)
+            records = []
+            for kind, path, payload in items:
+                if kind == 'many':
+                    records.extend(payload)
+                else:
+                    records.append((kind, path, payload))
+            try:
+                if records:
+                    self._write_batch(records)
+                    unflushed += len(records)
+                
+                now = time.monotonic()
+                if not running or unflushed >= self.batch_size or now - last_flush >= self.flush_interval:
+                    self._flush_files()
+                    unflushed = 0
+                    last_flush = now
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def flush(self):
+        """Block until every queued record has been written."""
+        if self.is_alive():
+            self._queue.join()
+    
+    def stop(self, timeout: float = 5.0):
+        """Drain the queue and stop the thread."""
+        if self.is_alive():
+            self._queue.put(_STOP)
+            self.join(timeout)
+
+# Field order of the fixed-schema JSON logs; callers queue a value tuple and
+# the writer thread zips it into the entry
+_INFERENCE_FIELDS = ('timestamp', 'interview_id', 'segments_count', 'status', 'duration_ms', 'error')
+_API_REQUEST_FIELDS = ('timestamp', 'endpoint', 'method', 'user_id', 'status_code',
+                       'duration_ms', 'request_data')
+_WEBSOCKET_FIELDS = ('timestamp', 'connection_id', 'event', 'data')
+
+# stdlib level for each LogLevel
+_LEVEL_MAP = {
+    LogLevel.DEBUG: logging.DEBUG,
+    LogLevel.INFO: logging.INFO,
+    LogLevel.WARNING: logging.WARNING,
+    LogLevel.ERROR: logging.ERROR,
+    LogLevel.CRITICAL: logging.CRITICAL
+}
+
+# Enum strings resolved once instead of .value/.upper() on every log() call
+_LVL_VAL = {level: sys.intern(level.value) for level in LogLevel}
+_CAT_VAL = {category: sys.intern(category.value) for category in LogCategory}
+_CAT_PREFIX = {category: sys.intern(f"[{category.value.upper()}] ") for category in LogCategory}
+
 class LoggingService:
     """Centralized logging service for SmartCAPI application."""
     
@@ -38,16 +301,53 @@ class LoggingService:
         
         # Initialize loggers
         self.system_logger = self._setup_logger('system', config.LOG_FILE)
+        self._log_methods = {
+            level: getattr(self.system_logger, level.value.lower()) for level in LogLevel
+        }
         self.json_logs = {}
         self.csv_logs = {}
+        # (second, formatted 'YYYY-MM-DDTHH:MM:SS') of the last timestamp
+        self._ts_cache = (None, '')
+        # Base JSON log path -> (YYYYMMDD, daily file) currently written to
+        self._daily_files: Dict[Path, tuple] = {}
+        
+        # All JSON/CSV log writes go through one background writer. JSON
+        # batches are collected per file and written with writev on cached
+        # O_APPEND descriptors; the lock guards both and keeps in-place
+        # rewrites (cleanup) from interleaving with its batches. CSV logs are
+        # shared with other services and processes, so their rows go through
+        # the shared appenders (utils.log_files) instead
+        self._file_lock = threading.Lock()
+        self._fds: Dict[Path, int] = {}
+        self._pending: Dict[Path, List[bytes]] = {}
+        self._csv_appenders = {}
+        self._uring = self._setup_uring()
         
         # Setup specialized logs
         self._setup_specialized_logs()
+        
+        self._writer = _AsyncLogWriter(self._write_batch, self._flush_handles)
+        self._writer.start()
+        atexit.register(self.close)
+    
+    def _setup_uring(self) -> Optional[_UringWriter]:
+        """io_uring flush backend when enabled and available, or None to flush with writev."""
+        if Ring is None or not getattr(config, 'LOG_USE_IO_URING', False):
+            return None
+        try:
+            return _UringWriter(getattr(config, 'LOG_IO_URING_ENTRIES', 256))
+        except OSError as e:
+            # Old kernel, or io_uring blocked by seccomp (common in containers)
+            self.system_logger.warning(f"io_uring unavailable, using writev for logs: {e}")
+            return None
     
     def _setup_logger(self, name: str, log_file: Path) -> logging.Logger:
         """
         Setup a logger with file and console handlers.
         
+        The logger itself only has a QueueHandler; formatting and file/console
+        output happen on a QueueListener thread.
+        
         Args:
             name: Logger name
             log_file: Path to log file
@@ -78,19 +378,35 @@ class LoggingService:
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        log_queue = queue.Queue(-1)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        
+        self._listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self._listener.stop)
         
         return logger
     
     def _setup_specialized_logs(self):
         """Setup specialized log files for different categories."""
-        # JSON logs
+        # JSON Lines logs (one entry per line, append-only). Each base path is
+        # partitioned into daily files: <stem>-YYYYMMDD<suffix>. Files are never
+        # rewritten in place, since other processes append to them; their size
+        # is bounded by cleanup_old_logs deleting whole days
         self.json_logs = {
-            'inference': config.INFERENCE_LOG,
-            'api_requests': self.logs_dir / 'api_requests.json',
-            'errors': self.logs_dir / 'errors.json',
-            'websocket': self.logs_dir / 'websocket.json'
+            'inference': Path(config.INFERENCE_LOG).with_suffix('.jsonl'),
+            'api_requests': self.logs_dir / 'api_requests.jsonl',
+            'errors': self.logs_dir / 'errors.jsonl',
+            'websocket': self.logs_dir / 'websocket.jsonl'
+        }
+        
+        # Categories whose general log entries also go to a JSON log
+        self._category_to_json_path = {
+            LogCategory.INFERENCE: self.json_logs['inference'],
+            LogCategory.API: self.json_logs['api_requests'],
+            LogCategory.WEBSOCKET: self.json_logs['websocket']
         }
         
         # CSV logs
@@ -106,7 +422,12 @@ class LoggingService:
         self._initialize_csv_logs()
     
     def _initialize_csv_logs(self):
-        """Initialize CSV log files with headers."""
+        """
+        Register the CSV logs with their shared appenders. The header row is
+        written by the appender when it creates the file, and rows go through
+        its inter-process lock like the ones registration_service and
+        retrain_service append to the same files.
+        """
         csv_headers = {
             'auth': ['timestamp', 'user_id', 'username', 'action', 'success', 'ip_address', 'user_agent'],
             'performance': ['timestamp', 'endpoint', 'method', 'duration_ms', 'status_code', 'user_id'],
@@ -117,10 +438,18 @@ class LoggingService:
         
         for log_type, headers in csv_headers.items():
             log_file = self.csv_logs.get(log_type)
-            if log_file and not log_file.exists():
-                with open(log_file, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(headers)
+            if log_file:
+                self._csv_appenders[log_file] = get_csv_appender(log_file, headers)
+    
+    def _now_iso(self) -> str:
+        """Local ISO-8601 timestamp with microseconds; the seconds part is formatted once per second."""
+        t = time.time()
+        sec = int(t)
+        cached_sec, prefix = self._ts_cache
+        if sec != cached_sec:
+            prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(sec))
+            self._ts_cache = (sec, prefix)
+        return f"{prefix}.{int((t - sec) * 1e6):06d}"
     
     # ==================== GENERAL LOGGING ====================
     
@@ -135,10 +464,16 @@ class LoggingService:
             category: Log category
             extra_data: Additional data to log
         """
+        # The level only gates the system logger; category JSON logs keep every entry
+        to_system_log = self.system_logger.isEnabledFor(_LEVEL_MAP[level])
+        log_file = self._category_to_json_path.get(category)
+        if not to_system_log and log_file is None:
+            return
+        
         log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'level': level.value,
-            'category': category.value,
+            'timestamp': self._now_iso(),
+            'level': _LVL_VAL[level],
+            'category': _CAT_VAL[category],
             'message': message
         }
         
@@ -146,11 +481,12 @@ class LoggingService:
             log_entry['data'] = extra_data
         
         # Log to system logger
-        log_method = getattr(self.system_logger, level.value.lower())
-        log_method(f"[{category.value.upper()}] {message}")
+        if to_system_log:
+            self._log_methods[level](_CAT_PREFIX[category] + message)
         
         # Log to category-specific file if available
-        self._log_to_category_file(category, log_entry)
+        if log_file is not None:
+            self._append_to_json_log(log_file, log_entry)
     
     def debug(self, message: str, category: LogCategory = LogCategory.SYSTEM, **kwargs):
         """Log debug message."""
@@ -176,11 +512,8 @@ class LoggingService:
             **kwargs: Additional data
         """
         extra_data = kwargs.copy()
-        
         if exception:
-            extra_data['exception_type'] = type(exception).__name__
-            extra_data['exception_message'] = str(exception)
-            extra_data['traceback'] = traceback.format_exc()
+            self._populate_exc(extra_data, exception)
         
         self.log(LogLevel.ERROR, message, category, extra_data)
         
@@ -191,31 +524,26 @@ class LoggingService:
                  exception: Optional[Exception] = None, **kwargs):
         """Log critical message."""
         extra_data = kwargs.copy()
-        
         if exception:
-            extra_data['exception_type'] = type(exception).__name__
-            extra_data['exception_message'] = str(exception)
-            extra_data['traceback'] = traceback.format_exc()
+            self._populate_exc(extra_data, exception)
         
         self.log(LogLevel.CRITICAL, message, category, extra_data)
     
-    def _log_to_category_file(self, category: LogCategory, log_entry: Dict):
-        """Log entry to category-specific file."""
-        category_files = {
-            LogCategory.INFERENCE: self.json_logs.get('inference'),
-            LogCategory.API: self.json_logs.get('api_requests'),
-            LogCategory.WEBSOCKET: self.json_logs.get('websocket')
-        }
-        
-        log_file = category_files.get(category)
-        if log_file:
-            self._append_to_json_log(log_file, log_entry)
+    def _populate_exc(self, extra_data: Dict, exception: Exception):
+        """
+        Add exception details to extra_data for error/critical. The traceback
+        is not formatted here: the exception is kept under '_exc' and the
+        writer thread formats it into 'traceback' when the entry is serialized.
+        """
+        extra_data['exception_type'] = type(exception).__name__
+        extra_data['exception_message'] = str(exception)
+        extra_data['_exc'] = exception
     
     def _log_error_to_json(self, message: str, category: LogCategory,
                            exception: Optional[Exception], extra_data: Dict):
         """Log error to errors.json file."""
         error_entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self._now_iso(),
             'category': category.value,
             'message': message,
             'data': extra_data
@@ -239,7 +567,7 @@ class LoggingService:
             user_agent: Client user agent
         """
         log_data = [
-            datetime.now().isoformat(),
+            self._now_iso(),
             user_id if user_id else '',
             username,
             action,
@@ -268,7 +596,7 @@ class LoggingService:
             status: Registration status
         """
         log_data = [
-            datetime.now().isoformat(),
+            self._now_iso(),
             user_id,
             username,
             speaker_id,
@@ -294,16 +622,9 @@ class LoggingService:
             duration_ms: Processing duration in milliseconds
             error: Error message if failed
         """
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'interview_id': interview_id,
-            'segments_count': segments_count,
-            'status': status,
-            'duration_ms': duration_ms,
-            'error': error
-        }
-        
-        self._append_to_json_log(self.json_logs['inference'], log_entry)
+        self._append_record(self.json_logs['inference'], _INFERENCE_FIELDS, (
+            self._now_iso(), interview_id, segments_count, status, duration_ms, error
+        ))
         
         self.info(f"Inference: Interview {interview_id} - {status}", LogCategory.INFERENCE,
                  segments=segments_count, duration_ms=duration_ms)
@@ -321,28 +642,22 @@ class LoggingService:
             duration_ms: Request duration in milliseconds
             request_data: Optional request data
         """
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'endpoint': endpoint,
-            'method': method,
-            'user_id': user_id,
-            'status_code': status_code,
-            'duration_ms': duration_ms,
-            'request_data': request_data
-        }
-        
-        self._append_to_json_log(self.json_logs['api_requests'], log_entry)
+        timestamp = self._now_iso()
+        api_values = (timestamp, endpoint, method, user_id, status_code, duration_ms, request_data)
         
-        # Also log to performance CSV
+        # Also log to performance CSV; both records go to the writer in one put
         perf_data = [
-            datetime.now().isoformat(),
+            timestamp,
             endpoint,
             method,
             duration_ms,
             status_code,
             user_id if user_id else ''
         ]
-        self._append_to_csv_log(self.csv_logs['performance'], perf_data)
+        self._writer.submit_many((
+            ('record', self.json_logs['api_requests'], (_API_REQUEST_FIELDS, api_values)),
+            ('csv', self.csv_logs['performance'], perf_data),
+        ))
     
     def log_training(self, status: str, train_accuracy: float, test_accuracy: float,
                     n_classes: int, n_samples: int, duration_seconds: float,
@@ -360,7 +675,7 @@ class LoggingService:
             error_message: Error message if failed
         """
         log_data = [
-            datetime.now().isoformat(),
+            self._now_iso(),
             status,
             train_accuracy,
             test_accuracy,
@@ -388,7 +703,7 @@ class LoggingService:
             message: Progress message
         """
         log_data = [
-            datetime.now().isoformat(),
+            self._now_iso(),
             task_id,
             task_type,
             status,
@@ -407,53 +722,136 @@ class LoggingService:
             event: Event type (connect, disconnect, message, error)
             data: Event data
         """
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'connection_id': connection_id,
-            'event': event,
-            'data': data
-        }
-        
-        self._append_to_json_log(self.json_logs['websocket'], log_entry)
+        self._append_record(self.json_logs['websocket'], _WEBSOCKET_FIELDS, (
+            self._now_iso(), connection_id, event, data
+        ))
         
         self.info(f"WebSocket {event}: {connection_id}", LogCategory.WEBSOCKET, data=data)
     
     # ==================== FILE OPERATIONS ====================
     
     def _append_to_json_log(self, log_file: Path, entry: Dict):
-        """Append entry to JSON log file."""
-        try:
-            # Load existing logs
-            logs = []
-            if log_file.exists():
-                try:
-                    with open(log_file, 'r') as f:
-                        logs = json.load(f)
-                except json.JSONDecodeError:
-                    logs = []
-            
-            # Append new entry
-            logs.append(entry)
+        """Queue entry to be appended as one line to a JSON Lines log file."""
+        self._writer.submit('json', log_file, entry)
+    
+    def _append_record(self, log_file: Path, fields: tuple, values: tuple):
+        """Queue a fixed-schema entry as a value tuple; the writer builds the dict."""
+        self._writer.submit('record', log_file, (fields, values))
+    
+    def _append_to_csv_log(self, log_file: Path, row: List[Any]):
+        """Queue row to be appended to a CSV log file."""
+        self._writer.submit('csv', log_file, row)
+    
+    def _write_batch(self, records: List[tuple]):
+        """Write a batch of queued records (writer thread), one append per file."""
+        with self._file_lock:
+            pending: Dict[Path, tuple] = {}
+            for kind, path, payload in records:
+                if kind == 'record':
+                    kind, payload = 'json', dict(zip(*payload))
+                if kind == 'json':
+                    path = self._daily_file(path, payload['timestamp'])
+                pending.setdefault(path, (kind, []))[1].append(payload)
             
-            # Keep only last 1000 entries
-            logs = logs[-1000:]
+            for log_file, (kind, payloads) in pending.items():
+                try:
+                    if kind == 'csv':
+                        # Locked append that follows the file if it was replaced
+                        self._csv_appenders[log_file].append_many(payloads)
+                        continue
+                    
+                    data = b''.join(json_line(_format_deferred_traceback(entry))
+                                    for entry in payloads)
+                    self._pending.setdefault(log_file, []).append(data)
+                
+                except Exception as e:
+                    self.system_logger.error(f"Error writing to log {log_file}: {e}")
+    
+    def _daily_file(self, log_file: Path, timestamp: str) -> Path:
+        """Daily partition of a JSON log for an entry's ISO timestamp (writer thread)."""
+        day = timestamp[:10].replace('-', '')
+        current = self._daily_files.get(log_file)
+        if current is None or current[0] != day:
+            if current is not None:
+                # Day rolled over: stop holding the previous file open
+                self._release_file(current[1])
+            current = (day, log_file.with_name(f"{log_file.stem}-{day}{log_file.suffix}"))
+            self._daily_files[log_file] = current
+        return current[1]
+    
+    def _json_log_files(self, log_file: Path) -> List[Path]:
+        """Daily files of a JSON log, oldest first."""
+        return sorted(log_file.parent.glob(f"{log_file.stem}-*{log_file.suffix}"))
+    
+    def _get_fd(self, log_file: Path) -> int:
+        """Return the cached O_APPEND descriptor for log_file, opening it on first use."""
+        fd = self._fds.get(log_file)
+        if fd is None:
+            fd = self._fds[log_file] = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return fd
+    
+    def _write_pending(self, log_file: Path):
+        """Write the buffers queued for log_file in one vectored write."""
+        buffers = self._pending.pop(log_file, None)
+        if buffers:
+            _write_buffers(self._get_fd(log_file), buffers)
+    
+    def _release_file(self, log_file: Path):
+        """Write pending buffers and close the descriptor, e.g. before the file is read or replaced."""
+        self._write_pending(log_file)
+        fd = self._fds.pop(log_file, None)
+        if fd is not None:
+            os.close(fd)
+    
+    def _flush_handles(self):
+        """Write out every file's pending buffers so readers see the entries."""
+        with self._file_lock:
+            if self._uring is not None:
+                self._flush_uring()
+                return
             
-            # Save logs
-            with open(log_file, 'w') as f:
-                json.dump(logs, f, indent=2)
-        
-        except Exception as e:
-            self.system_logger.error(f"Error writing to JSON log {log_file}: {e}")
+            for log_file in list(self._pending):
+                try:
+                    self._write_pending(log_file)
+                except Exception as e:
+                    self._flush_failed(log_file, e)
     
-    def _append_to_csv_log(self, log_file: Path, row: List[Any]):
-        """Append row to CSV log file."""
-        try:
-            with open(log_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(row)
-        
-        except Exception as e:
-            self.system_logger.error(f"Error writing to CSV log {log_file}: {e}")
+    def _flush_uring(self):
+        """Write every file's pending buffers in one io_uring submission."""
+        files, groups = [], []
+        for log_file in list(self._pending):
+            buffers = self._pending.pop(log_file)
+            try:
+                groups.append((self._get_fd(log_file), buffers))
+                files.append(log_file)
+            except Exception as e:
+                self._flush_failed(log_file, e)
+        
+        if groups:
+            for index, e in self._uring.write(groups).items():
+                self._flush_failed(files[index], e)
+    
+    def _flush_failed(self, log_file: Path, error: Exception):
+        """Drop the descriptor of a file whose write failed so the next write reopens it."""
+        fd = self._fds.pop(log_file, None)
+        if fd is not None:
+            os.close(fd)
+        self.system_logger.error(f"Error flushing log {log_file}: {error}")
+    
+    def flush(self):
+        """Wait until all queued log records are on disk."""
+        self._writer.flush()
+        self._flush_handles()
+    
+    def close(self):
+        """Drain pending log records, stop the writer thread and close log files."""
+        self._writer.stop()
+        with self._file_lock:
+            for log_file in list(self._pending) + list(self._fds):
+                self._release_file(log_file)
+            if self._uring is not None:
+                self._uring.close()
+                self._uring = None
     
     # ==================== LOG RETRIEVAL ====================
     
@@ -471,39 +869,61 @@ class LoggingService:
             List of log entries
         """
         log_file = self.json_logs.get(log_type)
-        if not log_file or not log_file.exists():
+        if not log_file:
             return []
         
         try:
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-            
-            # Apply filters
-            if filter_by:
-                logs = self._filter_logs(logs, filter_by)
+            # Walk daily files newest first, keeping only the latest `limit`
+            # entries in memory (mmap tail scan, or streaming when filtering)
+            logs = deque()
+            for path in reversed(self._json_log_files(log_file)):
+                needed = limit - len(logs)
+                if needed <= 0:
+                    break
+                
+                if filter_by:
+                    with open(path, 'rb') as f:
+                        entries = (json_loads(line) for line in f if line.strip())
+                        tail = list(deque(self._filter_logs(entries, filter_by), maxlen=needed))
+                else:
+                    tail = [json_loads(line) for line in _tail_lines(path, needed)]
+                
+                logs.extendleft(reversed(tail))
             
-            # Return latest logs
-            return logs[-limit:]
+            return list(logs)
         
         except Exception as e:
             self.system_logger.error(f"Error reading logs: {e}")
             return []
     
-    def _filter_logs(self, logs: List[Dict], filter_by: Dict) -> List[Dict]:
-        """Filter logs by criteria."""
-        filtered = []
-        
-        for log in logs:
-            match = True
-            for key, value in filter_by.items():
-                if log.get(key) != value:
-                    match = False
-                    break
-            
-            if match:
-                filtered.append(log)
-        
-        return filtered
+    def iter_logs(self, log_type: str) -> Iterator[Dict]:
+        """Stream every entry of a JSON log, oldest daily file first."""
+        log_file = self.json_logs.get(log_type)
+        if not log_file:
+            return
+        
+        for path in self._json_log_files(log_file):
+            try:
+                with open(path, 'rb') as f:
+                    for line in f:
+                        if line.strip():
+                            yield json_loads(line)
+            except FileNotFoundError:
+                # Removed by cleanup_old_logs meanwhile
+                continue
+    
+    def _filter_logs(self, logs: Iterable[Dict], filter_by: Dict) -> Iterator[Dict]:
+        """Lazily filter logs by criteria."""
+        keys = tuple(filter_by)
+        values = tuple(filter_by[key] for key in keys)
+        
+        if len(keys) == 1:
+            key, value = keys[0], values[0]
+            return (log for log in logs if log.get(key) == value)
+        
+        # One C-level map of dict.get per row, compared as a tuple; missing
+        # keys read as None like before
+        return (log for log in logs if tuple(map(log.get, keys)) == values)
     
     def get_csv_logs(self, log_type: str, limit: int = 100) -> List[Dict]:
         """
@@ -521,10 +941,8 @@ class LoggingService:
             return []
         
         try:
-            import pandas as pd
-            df = pd.read_csv(log_file)
-            df = df.tail(limit)
-            return df.to_dict('records')
+            with open(log_file, 'r', newline='') as f:
+                return list(deque(csv.DictReader(f), maxlen=limit))
         
         except Exception as e:
             self.system_logger.error(f"Error reading CSV logs: {e}")
@@ -545,34 +963,31 @@ class LoggingService:
         stats = {
             'json_logs': {},
             'csv_logs': {},
-            'total_size_mb': 0
+            'total_size_mb': 0,
+            'dropped_entries': self._writer.dropped
         }
         
         # Count JSON logs
+        json_files = []
         for log_type, log_file in self.json_logs.items():
-            if log_file.exists():
-                with open(log_file, 'r') as f:
-                    try:
-                        logs = json.load(f)
-                        stats['json_logs'][log_type] = len(logs)
-                    except:
-                        stats['json_logs'][log_type] = 0
+            files = self._json_log_files(log_file)
+            if files:
+                stats['json_logs'][log_type] = sum(_count_lines(path) for path in files)
+                json_files.extend(files)
         
         # Count CSV logs
         for log_type, log_file in self.csv_logs.items():
             if log_file.exists():
                 try:
-                    import pandas as pd
-                    df = pd.read_csv(log_file)
-                    stats['csv_logs'][log_type] = len(df)
-                except:
+                    # Rows, not counting the header
+                    stats['csv_logs'][log_type] = max(_count_lines(log_file) - 1, 0)
+                except Exception:
                     stats['csv_logs'][log_type] = 0
         
         # Calculate total size
-        for file_dict in [self.json_logs, self.csv_logs]:
-            for log_file in file_dict.values():
-                if log_file.exists():
-                    stats['total_size_mb'] += log_file.stat().st_size / (1024 * 1024)
+        for log_file in json_files + list(self.csv_logs.values()):
+            if log_file.exists():
+                stats['total_size_mb'] += log_file.stat().st_size / (1024 * 1024)
         
         stats['total_size_mb'] = round(stats['total_size_mb'], 2)
         
@@ -593,30 +1008,29 @@ class LoggingService:
         
         # Clean JSON logs
         for log_file in self.json_logs.values():
-            if log_file.exists():
-                self._cleanup_json_log(log_file, cutoff_date)
+            self._cleanup_json_log(log_file, cutoff_date)
         
         self.info("Log cleanup completed", LogCategory.SYSTEM)
     
     def _cleanup_json_log(self, log_file: Path, cutoff_timestamp: float):
-        """Clean up old entries from JSON log file."""
+        """Delete daily files of a JSON log whose whole day is older than the cutoff."""
         try:
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-            
-            # Filter logs
-            filtered_logs = [
-                log for log in logs
-                if datetime.fromisoformat(log['timestamp']).timestamp() > cutoff_timestamp
-            ]
-            
-            # Save filtered logs
-            with open(log_file, 'w') as f:
-                json.dump(filtered_logs, f, indent=2)
+            removed = 0
+            with self._file_lock:
+                for path in self._json_log_files(log_file):
+                    day = path.stem.rsplit('-', 1)[1]
+                    try:
+                        day_end = datetime.strptime(day, '%Y%m%d') + timedelta(days=1)
+                    except ValueError:
+                        continue
+                    
+                    if day_end.timestamp() <= cutoff_timestamp:
+                        self._release_file(path)
+                        path.unlink()
+                        removed += 1
             
-            removed = len(logs) - len(filtered_logs)
             if removed > 0:
-                self.info(f"Removed {removed} old entries from {log_file.name}", LogCategory.SYSTEM)
+                self.info(f"Removed {removed} old files of {log_file.name}", LogCategory.SYSTEM)
         
         except Exception as e:
             self.error(f"Error cleaning up {log_file.name}", LogCategory.SYSTEM, exception=e)
@@ -670,6 +1084,7 @@ if __name__ == "__main__":
         logger.error("Test error occurred", LogCategory.SYSTEM, exception=e)
     
     # Get statistics
+    logger.flush()
     stats = logger.get_log_statistics()
     print("\nLog Statistics:")
     print(json.dumps(stats, indent=2))
@@ -1,14 +1,76 @@
+import os
 import shutil
-import json
+import csv
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 import pandas as pd
 from sqlalchemy.orm import Session
 import config
 from api.database import User, VoiceRegistration
 from utils.audio_utils import preprocess_audio, split_audio_file
 from utils.feature_utils import extract_features_from_file
+from utils.json_utils import json_dumps, json_line, json_loads
+from utils.log_files import interprocess_lock, get_csv_appender
+
+REGISTRATION_LOG_COLUMNS = ['timestamp', 'user_id', 'username', 'speaker_id', 'num_segments', 'status']
+STATUS_JOURNAL_COLUMNS = ['speaker_id', 'status', 'timestamp']
+
+
+
+# Pending registrations parsed from the log, shared by all service instances:
+# 'entry' is (file signatures, header, raw rows), where the signatures are the
+# (mtime_ns, size) of the registration log and status journal
+_pending_cache: Dict[str, tuple] = {}
+
+
+def _file_signature(path: Path):
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def write_enumerator_snapshot(list_path: Path, enumerator_list: Dict):
+    """
+    Atomically replace the enumerator list JSON, then drop the change
+    journal it supersedes. Journal appends wait until both steps are done.
+    """
+    journal_path = list_path.with_suffix('.jsonl')
+    with interprocess_lock(journal_path):
+        tmp_path = list_path.with_suffix('.tmp')
+        tmp_path.write_bytes(json_dumps(enumerator_list, indent=True))
+        os.replace(tmp_path, list_path)
+        journal_path.unlink(missing_ok=True)
+
+
+def read_enumerator_list(list_path: Path) -> Tuple[Dict, int]:
+    """
+    Enumerator list from the JSON snapshot with its change journal
+    (<list>.jsonl) replayed on top, and the number of journal entries.
+    """
+    enumerator_list = {}
+    if list_path.exists():
+        enumerator_list = json_loads(list_path.read_bytes())
+    
+    entries = 0
+    journal_path = list_path.with_suffix('.jsonl')
+    if journal_path.exists():
+        with open(journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    change = json_loads(line)
+                except ValueError:
+                    continue  # blank or torn line from an interrupted append
+                if change['op'] == 'add':
+                    enumerator_list[change['id']] = change['data']
+                else:
+                    enumerator_list.pop(change['id'], None)
+                entries += 1
+    
+    return enumerator_list, entries
+
 
 class VoiceRegistrationService:
     """Service for registering enumerator voices."""
@@ -17,19 +79,34 @@ class VoiceRegistrationService:
         self.db = db
         self.registration_dir = config.REGISTRATION_DIR
         self.enumerator_list_path = config.ENUMERATOR_LIST_PATH
+        # Changes since the last snapshot, one JSON object per line
+        self.enumerator_journal_path = self.enumerator_list_path.with_suffix('.jsonl')
+        self._journal_entries = 0
+        self.status_journal_path = getattr(
+            config, 'REGISTRATION_STATUS_JOURNAL',
+            config.REGISTRATION_LOG.with_name(f"{config.REGISTRATION_LOG.stem}_status.csv")
+        )
         self.enumerator_list = self.load_enumerator_list()
     
     def load_enumerator_list(self) -> Dict:
-        """Load enumerator list from JSON."""
-        if self.enumerator_list_path.exists():
-            with open(self.enumerator_list_path, 'r') as f:
-                return json.load(f)
-        return {}
+        """Load enumerator list from JSON and replay the change journal on top."""
+        enumerator_list, self._journal_entries = read_enumerator_list(self.enumerator_list_path)
+        return enumerator_list
     
     def save_enumerator_list(self):
-        """Save enumerator list to JSON."""
-        with open(self.enumerator_list_path, 'w') as f:
-            json.dump(self.enumerator_list, f, indent=2)
+        """Save enumerator list to JSON (a full snapshot; clears the change journal)."""
+        write_enumerator_snapshot(self.enumerator_list_path, self.enumerator_list)
+        self._journal_entries = 0
+    
+    def _journal_enumerator_changes(self, changes: List[Dict]):
+        """Append enumerator list changes to the journal, compacting it into a snapshot once it grows."""
+        with interprocess_lock(self.enumerator_journal_path):
+            with open(self.enumerator_journal_path, 'ab') as f:
+                f.write(b''.join(json_line(change) for change in changes))
+        
+        self._journal_entries += len(changes)
+        if self._journal_entries >= getattr(config, 'ENUMERATOR_JOURNAL_MAX_ENTRIES', 256):
+            self.save_enumerator_list()
     
     def register_voice(self, user_id: int, username: str, 
                       audio_file_path: str,
@@ -46,120 +123,312 @@ class VoiceRegistrationService:
         Returns:
             Registration result dictionary
         """
-        try:
-            # Create user directory
-            user_dir = self.registration_dir / username
-            user_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Preprocess audio
-            temp_preprocessed = config.TEMP_DIR / f"{username}_preprocessed.wav"
-            preprocess_audio(audio_file_path, str(temp_preprocessed))
-            
-            # Split audio into segments
-            segments = split_audio_file(
-                str(temp_preprocessed),
-                str(user_dir),
-                segment_duration=config.AUDIO_DURATION
-            )
-            
-            if len(segments) < num_segments:
-                return {
+        return self.register_voices_bulk([{
+            'user_id': user_id,
+            'username': username,
+            'audio_file_path': audio_file_path
+        }], num_segments=num_segments)[0]
+    
+    def register_voices_bulk(self, items: List[Dict], num_segments: int = 20) -> List[Dict]:
+        """
+        Register several voices. Audio is processed per voice; the enumerator
+        list, the database rows (one bulk insert and commit) and the
+        registration log are written once for the whole batch.
+        
+        Args:
+            items: Dicts with user_id, username and audio_file_path
+            num_segments: Number of audio segments to create per voice
+        
+        Returns:
+            One registration result dictionary per item, in order
+        """
+        results = []
+        registered = []
+        for item in items:
+            try:
+                result, registration = self._prepare_registration(
+                    item['user_id'], item['username'], item['audio_file_path'], num_segments
+                )
+            except Exception as e:
+                result, registration = {
                     'success': False,
-                    'message': f'Audio too short. Need at least {num_segments} segments, got {len(segments)}',
-                    'segments_created': len(segments)
-                }
-            
-            # Use only required number of segments
-            segments = segments[:num_segments]
+                    'message': f'Registration failed: {str(e)}'
+                }, None
             
-            # Generate speaker ID
-            speaker_id = f"enum_{user_id}_{username}"
-            
-            # Add to enumerator list
-            self.enumerator_list[speaker_id] = {
-                'user_id': user_id,
-                'username': username,
-                'registration_date': datetime.now().isoformat(),
-                'num_segments': len(segments)
-            }
-            self.save_enumerator_list()
+            results.append(result)
+            if registration is not None:
+                registered.append((len(results) - 1, registration))
+        
+        if not registered:
+            return results
+        
+        try:
+            self._journal_enumerator_changes([
+                {'op': 'add', 'id': r['speaker_id'], 'data': self.enumerator_list[r['speaker_id']]}
+                for _, r in registered
+            ])
             
-            # Save registration to database
+            # Save registrations to database
             if self.db:
-                registration = VoiceRegistration(
-                    user_id=user_id,
-                    speaker_id=speaker_id,
-                    audio_file_path=str(user_dir),
-                    is_verified=True,
-                    confidence_score=1.0
-                )
-                self.db.add(registration)
+                self.db.bulk_save_objects([
+                    VoiceRegistration(
+                        user_id=registration['user_id'],
+                        speaker_id=registration['speaker_id'],
+                        audio_file_path=registration['audio_file_path'],
+                        is_verified=True,
+                        confidence_score=1.0
+                    )
+                    for _, registration in registered
+                ])
                 self.db.commit()
             
-            # Log registration
-            self.log_registration(user_id, username, speaker_id, len(segments))
-            
-            # Clean up temp file
-            if temp_preprocessed.exists():
-                temp_preprocessed.unlink()
-            
-            return {
-                'success': True,
-                'speaker_id': speaker_id,
-                'username': username,
-                'segments_created': len(segments),
-                'message': 'Voice registration successful. Model will be retrained automatically.'
-            }
+            # Log registrations
+            self._log_registrations([
+                (r['user_id'], r['username'], r['speaker_id'], r['num_segments'])
+                for _, r in registered
+            ])
         
         except Exception as e:
+            for index, _ in registered:
+                results[index] = {
+                    'success': False,
+                    'message': f'Registration failed: {str(e)}'
+                }
+        
+        return results
+    
+    def _prepare_registration(self, user_id: int, username: str, audio_file_path: str,
+                              num_segments: int) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Create the audio segments of one voice and add it to the in-memory
+        enumerator list. Returns the result dictionary and, on success, the
+        fields of the registration to persist.
+        """
+        # Create user directory
+        user_dir = self.registration_dir / username
+        user_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Preprocess audio
+        temp_preprocessed = config.TEMP_DIR / f"{username}_preprocessed.wav"
+        preprocess_audio(audio_file_path, str(temp_preprocessed))
+        
+        # Split audio into segments
+        segments = split_audio_file(
+            str(temp_preprocessed),
+            str(user_dir),
+            segment_duration=config.AUDIO_DURATION
+        )
+        
+        if len(segments) < num_segments:
             return {
                 'success': False,
-                'message': f'Registration failed: {str(e)}'
-            }
-    
-    def log_registration(self, user_id: int, username: str, 
-                        speaker_id: str, num_segments: int):
-        """Log registration to CSV."""
-        log_file = config.REGISTRATION_LOG
+                'message': f'Audio too short. Need at least {num_segments} segments, got {len(segments)}',
+                'segments_created': len(segments)
+            }, None
         
-        log_data = {
-            'timestamp': datetime.now().isoformat(),
+        # Use only required number of segments
+        segments = segments[:num_segments]
+        
+        # Generate speaker ID
+        speaker_id = f"enum_{user_id}_{username}"
+        
+        # Add to enumerator list
+        self.enumerator_list[speaker_id] = {
             'user_id': user_id,
             'username': username,
-            'speaker_id': speaker_id,
-            'num_segments': num_segments,
-            'status': 'pending_retrain'
+            'registration_date': datetime.now().isoformat(),
+            'num_segments': len(segments)
         }
         
-        # Create or append to CSV
-        df = pd.DataFrame([log_data])
-        if log_file.exists():
-            df.to_csv(log_file, mode='a', header=False, index=False)
-        else:
-            df.to_csv(log_file, index=False)
+        # Clean up temp file
+        if temp_preprocessed.exists():
+            temp_preprocessed.unlink()
+        
+        return {
+            'success': True,
+            'speaker_id': speaker_id,
+            'username': username,
+            'segments_created': len(segments),
+            'message': 'Voice registration successful. Model will be retrained automatically.'
+        }, {
+            'user_id': user_id,
+            'username': username,
+            'speaker_id': speaker_id,
+            'audio_file_path': str(user_dir),
+            'num_segments': len(segments)
+        }
+    
+    def log_registration(self, user_id: int, username: str, 
+                        speaker_id: str, num_segments: int):
+        """Log registration to CSV."""
+        self._log_registrations([(user_id, username, speaker_id, num_segments)])
+    
+    def _log_registrations(self, registrations: List[tuple]):
+        """Log (user_id, username, speaker_id, num_segments) registrations in one append."""
+        timestamp = datetime.now().isoformat()
+        get_csv_appender(config.REGISTRATION_LOG, REGISTRATION_LOG_COLUMNS).append_many([
+            [timestamp, user_id, username, speaker_id, num_segments, 'pending_retrain']
+            for user_id, username, speaker_id, num_segments in registrations
+        ])
+        _pending_cache.pop('entry', None)
     
     def get_pending_retrains(self) -> List[Dict]:
         """Get list of registrations pending retrain."""
+        header, rows = self._pending_rows()
+        
+        records = [dict(zip(header, row)) for row in rows]
+        for record in records:
+            record['user_id'] = int(record['user_id'])
+            record['num_segments'] = int(record['num_segments'])
+        return records
+    
+    def get_pending_speaker_ids(self) -> List[str]:
+        """Speaker ID of every pending registration, without building row dicts."""
+        header, rows = self._pending_rows()
+        index = header.index('speaker_id')
+        return [row[index] for row in rows]
+    
+    def count_pending_retrains(self) -> int:
+        """Number of registrations pending retrain, counted without keeping any rows."""
         log_file = config.REGISTRATION_LOG
         
-        if not log_file.exists():
-            return []
+        key = (_file_signature(log_file), _file_signature(self.status_journal_path))
+        if key[0] is None:
+            return 0
         
-        df = pd.read_csv(log_file)
-        pending = df[df['status'] == 'pending_retrain']
+        entry = _pending_cache.get('entry')
+        if entry is not None and entry[0] == key:
+            return len(entry[2])
         
-        return pending.to_dict('records')
+        retrained_at = self._read_status_journal()
+        with open(log_file, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return 0
+            
+            ts, sid, status = (header.index(col) for col in ('timestamp', 'speaker_id', 'status'))
+            return sum(
+                1 for row in reader
+                if row[status] == 'pending_retrain' and row[ts] > retrained_at.get(row[sid], '')
+            )
     
-    def mark_retrain_complete(self, speaker_id: str):
-        """Mark registration as retrained."""
+    def _pending_rows(self) -> Tuple[List[str], List[List[str]]]:
+        """
+        Header and raw rows of the registrations pending retrain. The parsed
+        rows are reused until the registration log or status journal changes.
+        """
         log_file = config.REGISTRATION_LOG
         
+        key = (_file_signature(log_file), _file_signature(self.status_journal_path))
+        if key[0] is None:
+            return REGISTRATION_LOG_COLUMNS, []
+        
+        entry = _pending_cache.get('entry')
+        if entry is None or entry[0] != key:
+            entry = (key, *self._read_pending_rows(log_file))
+            _pending_cache['entry'] = entry
+        return entry[1], entry[2]
+    
+    def _read_pending_rows(self, log_file: Path) -> Tuple[List[str], List[List[str]]]:
+        """Stream the registration log, keeping only rows still pending retrain."""
+        retrained_at = self._read_status_journal()
+        with open(log_file, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return REGISTRATION_LOG_COLUMNS, []
+            
+            ts, sid, status = (header.index(col) for col in ('timestamp', 'speaker_id', 'status'))
+            rows = [
+                row for row in reader
+                if row[status] == 'pending_retrain' and row[ts] > retrained_at.get(row[sid], '')
+            ]
+        return header, rows
+    
+    def mark_retrain_complete(self, speaker_id: str):
+        """
+        Mark registration as retrained.
+        
+        The registration log is not rewritten: a status change is appended to
+        the status journal and applied when the log is read.
+        """
+        if not config.REGISTRATION_LOG.exists():
+            return
+        
+        get_csv_appender(self.status_journal_path, STATUS_JOURNAL_COLUMNS).append([
+            speaker_id,
+            'retrained',
+            datetime.now().isoformat()
+        ])
+        _pending_cache.pop('entry', None)
+        self._compact_status_journal_if_large()
+    
+    def mark_retrain_complete_bulk(self, speaker_ids: Iterable[str]):
+        """
+        Mark the registrations of several speakers as retrained with one
+        journal append; like mark_retrain_complete, the registration log is
+        only rewritten once the journal outgrows its size limit.
+        """
+        if not config.REGISTRATION_LOG.exists():
+            return
+        
+        timestamp = datetime.now().isoformat()
+        rows = [[speaker_id, 'retrained', timestamp] for speaker_id in dict.fromkeys(speaker_ids)]
+        if not rows:
+            return
+        
+        get_csv_appender(self.status_journal_path, STATUS_JOURNAL_COLUMNS).append_many(rows)
+        _pending_cache.pop('entry', None)
+        self._compact_status_journal_if_large()
+    
+    def _compact_status_journal_if_large(self):
+        max_bytes = getattr(config, 'REGISTRATION_JOURNAL_MAX_BYTES', 1 << 20)
+        if _file_signature(self.status_journal_path) is not None and \
+                self.status_journal_path.stat().st_size > max_bytes:
+            self.compact_status_journal()
+    
+    def _read_status_journal(self) -> Dict[str, str]:
+        """Latest 'retrained' timestamp per speaker, streamed from the journal."""
+        retrained_at = {}
+        if self.status_journal_path.exists():
+            with open(self.status_journal_path, newline='') as f:
+                for row in csv.DictReader(f):
+                    if row['status'] == 'retrained':
+                        retrained_at[row['speaker_id']] = row['timestamp']
+        return retrained_at
+    
+    def _apply_status_journal(self, df: pd.DataFrame,
+                              retrained_at: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Mark rows registered before their speaker's latest journal entry as retrained."""
+        if retrained_at is None:
+            retrained_at = self._read_status_journal()
+        if retrained_at:
+            done = df['timestamp'] <= df['speaker_id'].map(retrained_at).fillna('')
+            df.loc[done, 'status'] = 'retrained'
+        return df
+    
+    def compact_status_journal(self):
+        """
+        Fold the status journal into the registration log and start a new
+        journal. The journal lock is held from reading it until it is deleted,
+        so status rows appended meanwhile wait and land in the new journal.
+        """
+        log_file = config.REGISTRATION_LOG
         if not log_file.exists():
             return
         
-        df = pd.read_csv(log_file)
-        df.loc[df['speaker_id'] == speaker_id, 'status'] = 'retrained'
-        df.to_csv(log_file, index=False)
+        def fold(journal_path: Path):
+            retrained_at = self._read_status_journal()
+            
+            def write(tmp_path: Path):
+                df = pd.read_csv(log_file)
+                self._apply_status_journal(df, retrained_at).to_csv(tmp_path, index=False)
+            
+            get_csv_appender(log_file, REGISTRATION_LOG_COLUMNS).replace_with(write)
+        
+        get_csv_appender(self.status_journal_path, STATUS_JOURNAL_COLUMNS).consume(fold)
+        _pending_cache.pop('entry', None)
     
     def delete_voice_registration(self, user_id: int, speaker_id: str) -> bool:
         """Delete voice registration."""
@@ -168,12 +437,10 @@ class VoiceRegistrationService:
             if speaker_id in self.enumerator_list:
                 username = self.enumerator_list[speaker_id]['username']
                 del self.enumerator_list[speaker_id]
-                self.save_enumerator_list()
+                self._journal_enumerator_changes([{'op': 'remove', 'id': speaker_id}])
                 
                 # Remove audio files
-                user_dir = self.registration_dir / username
-                if user_dir.exists():
-                    shutil.rmtree(user_dir)
+                shutil.rmtree(self.registration_dir / username, ignore_errors=True)
                 
                 # Update database
                 if self.db:
@@ -198,12 +465,17 @@ class VoiceRegistrationService:
         total_segments = 0
         for speaker_id, info in self.enumerator_list.items():
             username = info['username']
-            user_dir = self.registration_dir / username
-            if user_dir.exists():
-                total_segments += len(list(user_dir.glob("*.wav")))
+            try:
+                with os.scandir(self.registration_dir / username) as entries:
+                    total_segments += sum(
+                        1 for entry in entries
+                        if entry.name.endswith('.wav') and entry.is_file()
+                    )
+            except FileNotFoundError:
+                pass
         
         # Get pending retrains
-        pending_retrains = len(self.get_pending_retrains())
+        pending_retrains = self.count_pending_retrains()
         
         return {
             'total_enumerators': total_enumerators,
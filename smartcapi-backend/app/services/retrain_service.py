@@ -1,15 +1,162 @@
 import pandas as pd
 import numpy as np
+import csv
 import json
+import os
+import hashlib
+import multiprocessing
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 import config
 from api.database import ModelMetrics
 from feature_extraction import FeatureExtractor
 from training.train import SpeakerIdentificationTrainer
-from services.registration_service import VoiceRegistrationService
+from services.registration_service import (
+    VoiceRegistrationService, get_csv_appender, write_enumerator_snapshot
+)
+from utils.json_utils import json_dumps
+
+RETRAIN_HISTORY_COLUMNS = ['timestamp', 'status', 'train_accuracy', 'test_accuracy',
+                           'n_classes', 'n_samples', 'duration_seconds', 'error_message']
+_HISTORY_CASTS = {'train_accuracy': float, 'test_accuracy': float, 'n_classes': int,
+                  'n_samples': int, 'duration_seconds': float}
+
+# History log path -> ((mtime_ns, size), newest record) for get_retrain_history(limit=1)
+_latest_retrain: Dict[str, tuple] = {}
+
+
+def _mfcc_columns(columns) -> List[str]:
+    return [col for col in columns if col.startswith('mfcc_')]
+
+
+def _retrain_columns(columns) -> List[str]:
+    """Columns retraining reads: label, filename (and its hash) and the MFCC features."""
+    return [col for col in columns if col in ('label', 'filename', 'fname_hash')] + _mfcc_columns(columns)
+
+
+def _filename_hashes(filenames: pd.Series) -> np.ndarray:
+    """Stable uint64 hash per filename, computed in one vectorized pass."""
+    return pd.util.hash_array(filenames.to_numpy(dtype=object))
+
+
+def _read_feature_csv(path: Path) -> pd.DataFrame:
+    """
+    Read the columns retraining uses from a feature CSV: label, filename and
+    the MFCC features as float32. Uses the multithreaded pyarrow parser when
+    pyarrow is installed.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = _retrain_columns(header)
+    dtype = dict.fromkeys(_mfcc_columns(header), 'float32')
+    
+    try:
+        return pd.read_csv(path, engine='pyarrow', usecols=usecols, dtype=dtype)
+    except ImportError:
+        return pd.read_csv(path, usecols=usecols, dtype=dtype)
+
+
+def _extract_partition(partition_dir: str) -> pd.DataFrame:
+    """Worker process: extract features for the speaker directories linked into partition_dir."""
+    return FeatureExtractor().extract_from_subdirectories(Path(partition_dir), preprocess=True)
+
+
+def _stratified_split(y: np.ndarray, test_size: float = 0.2,
+                      seed: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stratified train/test indices computed with array operations only.
+    
+    Samples are sorted by class with a random tie-break (a shuffle within
+    each class); the first round(count * test_size) positions of every class
+    run go to the test set, keeping at least one sample of each class in
+    train and, for classes with two or more samples, one in test.
+    """
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(y)), y))
+    _, starts, counts = np.unique(y[order], return_index=True, return_counts=True)
+    
+    n_test = np.rint(counts * test_size).astype(np.int64)
+    n_test = np.where(counts > 1, np.clip(n_test, 1, counts - 1), 0)
+    
+    rank = np.arange(len(y)) - np.repeat(starts, counts)
+    is_test = rank < np.repeat(n_test, counts)
+    return np.sort(order[~is_test]), np.sort(order[is_test])
+
+
+def _speaker_signature(speaker_dir: Path) -> str:
+    """Fingerprint of a speaker directory: (name, mtime_ns, size) of every file in it."""
+    entries = []
+    for entry in os.scandir(speaker_dir):
+        if entry.is_file():
+            st = entry.stat()
+            entries.append((entry.name, st.st_mtime_ns, st.st_size))
+    return hashlib.sha1(repr(sorted(entries)).encode()).hexdigest()
+
+
+def _history_signature(path: Path):
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _history_record(header: List[str], row: List) -> Dict:
+    """Build a history record from a CSV row, restoring the numeric columns."""
+    record = {}
+    for col, value in zip(header, row):
+        if value is None or value == '':
+            value = None
+        elif col in _HISTORY_CASTS:
+            value = _HISTORY_CASTS[col](float(value))
+        record[col] = value
+    return record
+
+
+def _tail_history(path: Path, limit: int, block_size: int = 4096) -> Tuple[List[str], List[List[str]]]:
+    """
+    Header and last `limit` rows of the append-only history log, newest
+    first, reading blocks backwards from EOF until enough lines are in hand.
+    """
+    with open(path, 'rb') as f:
+        header_line = f.readline()
+        header_end = f.tell()
+        pos = f.seek(0, os.SEEK_END)
+        data = b''
+        while pos > header_end and data.count(b'\n') <= limit:
+            step = min(block_size, pos - header_end)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    
+    lines = data.splitlines()
+    if pos > header_end:
+        # The first line in the window may start mid-row
+        lines = lines[1:]
+    lines = [line for line in lines if line][-limit:]
+    
+    header = next(csv.reader([header_line.decode('utf-8')]), [])
+    rows = list(csv.reader(line.decode('utf-8') for line in lines))
+    if any(len(row) != len(header) for row in rows):
+        # A quoted field spans lines; only a forward parse can split rows
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            rows = list(deque(reader, maxlen=limit))
+    rows.reverse()
+    return header, rows
+
+
+def _read_feature_parquet(path: Path) -> pd.DataFrame:
+    """Read the columns retraining uses from a Parquet feature file (dtypes are stored)."""
+    import pyarrow.parquet as pq
+    
+    columns = _retrain_columns(pq.read_schema(path).names)
+    return pd.read_parquet(path, engine='pyarrow', columns=columns)
 
 class RetrainService:
     """Service for managing model retraining process."""
@@ -20,6 +167,12 @@ class RetrainService:
         self.trainer = SpeakerIdentificationTrainer()
         self.registration_service = VoiceRegistrationService(db)
         self.retrain_history_log = config.RETRAIN_HISTORY_LOG
+        self.features_enumerator_parquet = getattr(
+            config, 'FEATURES_ENUMERATOR_PARQUET',
+            config.FEATURES_ENUMERATOR_CSV.with_suffix('.parquet')
+        )
+        # Speaker directory -> signature of the audio its Parquet rows came from
+        self.features_sources_path = self.features_enumerator_parquet.with_suffix('.sources.json')
     
     def check_retrain_needed(self) -> Dict:
         """
@@ -28,13 +181,13 @@ class RetrainService:
         Returns:
             Dictionary with status and pending count
         """
-        pending = self.registration_service.get_pending_retrains()
+        pending_count = self.registration_service.count_pending_retrains()
         
-        needs_retrain = len(pending) >= config.MIN_SAMPLES_FOR_RETRAIN
+        needs_retrain = pending_count >= config.MIN_SAMPLES_FOR_RETRAIN
         
         return {
             'needs_retrain': needs_retrain,
-            'pending_count': len(pending),
+            'pending_count': pending_count,
             'threshold': config.MIN_SAMPLES_FOR_RETRAIN,
             'auto_retrain_enabled': config.AUTO_RETRAIN
         }
@@ -49,11 +202,23 @@ class RetrainService:
         try:
             print("Extracting features from registration directory...")
             
-            # Extract features from registration directory
-            df = self.feature_extractor.extract_from_subdirectories(
-                config.REGISTRATION_DIR,
-                preprocess=True
-            )
+            # Only speakers whose audio changed since the last run are
+            # re-extracted; the rest are reused from the Parquet artifact
+            registration_dir = config.REGISTRATION_DIR
+            speaker_dirs = sorted(p for p in registration_dir.iterdir() if p.is_dir()) \
+                if registration_dir.exists() else []
+            signatures = {d.name: _speaker_signature(d) for d in speaker_dirs}
+            
+            cached_df, cached_signatures = self._load_feature_cache()
+            stale = [d for d in speaker_dirs if cached_signatures.get(d.name) != signatures[d.name]]
+            print(f"Re-extracting {len(stale)} of {len(speaker_dirs)} speakers")
+            
+            frames = [self._extract_registration_features(stale)]
+            if cached_df is not None:
+                unchanged = set(signatures).difference(d.name for d in stale)
+                frames.insert(0, cached_df[cached_df['label'].isin(unchanged)])
+            frames = [frame for frame in frames if not frame.empty]
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
             
             if df.empty:
                 return {
@@ -62,14 +227,14 @@ class RetrainService:
                     'samples_extracted': 0
                 }
             
-            # Save to enumerator features CSV
-            self.feature_extractor.save_features(df, config.FEATURES_ENUMERATOR_CSV)
+            # Save enumerator features as Parquet (CSV if pyarrow is missing)
+            self._save_enumerator_features(df, signatures)
             
             return {
                 'success': True,
                 'message': 'Features extracted successfully',
                 'samples_extracted': len(df),
-                'unique_speakers': len(df['label'].unique())
+                'unique_speakers': df['label'].nunique()
             }
         
         except Exception as e:
@@ -79,6 +244,92 @@ class RetrainService:
                 'samples_extracted': 0
             }
     
+    def _extract_registration_features(self, speaker_dirs: List[Path]) -> pd.DataFrame:
+        """
+        Extract features for the given speaker directories, spread over
+        worker processes.
+        
+        Speaker directories are symlinked round-robin into one staging
+        directory per worker, so each worker runs the regular
+        extract_from_subdirectories on its share and labels are unchanged.
+        Workers are started with the spawn method, which is safe from the
+        threaded API; inside a daemonic process (Celery prefork worker), which
+        cannot have children, everything is extracted in this process.
+        """
+        if not speaker_dirs:
+            return pd.DataFrame()
+        
+        workers = min(getattr(config, 'RETRAIN_WORKERS', None) or os.cpu_count() or 1,
+                      len(speaker_dirs))
+        if multiprocessing.current_process().daemon:
+            workers = 1
+        
+        with tempfile.TemporaryDirectory(prefix='retrain_features_') as staging:
+            partitions = [Path(staging) / f"part_{i}" for i in range(workers)]
+            links = []
+            try:
+                try:
+                    for i, speaker_dir in enumerate(speaker_dirs):
+                        partition = partitions[i % workers]
+                        partition.mkdir(exist_ok=True)
+                        link = partition / speaker_dir.name
+                        link.symlink_to(speaker_dir, target_is_directory=True)
+                        links.append(link)
+                except OSError:
+                    # No symlink permission (e.g. Windows without developer mode):
+                    # extract the whole registration directory in this process
+                    df = self.feature_extractor.extract_from_subdirectories(
+                        config.REGISTRATION_DIR, preprocess=True
+                    )
+                    return df[df['label'].isin([d.name for d in speaker_dirs])] if not df.empty else df
+                
+                if workers == 1:
+                    return self.feature_extractor.extract_from_subdirectories(partitions[0], preprocess=True)
+                
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context('spawn')) as executor:
+                    frames = [df for df in executor.map(_extract_partition, map(str, partitions))
+                              if not df.empty]
+            finally:
+                # Remove the links themselves before the staging directory is
+                # deleted, so nothing is ever removed through them
+                for link in links:
+                    link.unlink()
+        
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    
+    def _load_feature_cache(self) -> Tuple[Optional[pd.DataFrame], Dict[str, str]]:
+        """Previous enumerator features and the speaker signatures they were extracted from."""
+        if not (self.features_enumerator_parquet.exists() and self.features_sources_path.exists()):
+            return None, {}
+        
+        try:
+            with open(self.features_sources_path, 'r') as f:
+                signatures = json.load(f)
+            return pd.read_parquet(self.features_enumerator_parquet, engine='pyarrow'), signatures
+        except Exception as e:
+            print(f"Ignoring enumerator feature cache: {e}")
+            return None, {}
+    
+    def _save_enumerator_features(self, df: pd.DataFrame, signatures: Dict[str, str]):
+        """
+        Store enumerator features as zstd Parquet with float32 MFCC columns, so
+        the next retrain loads them without parsing text or inferring dtypes,
+        together with the speaker signatures used to skip unchanged speakers.
+        """
+        df = df.astype(dict.fromkeys(_mfcc_columns(df.columns), 'float32'))
+        if 'filename' in df.columns:
+            df['fname_hash'] = _filename_hashes(df['filename'])
+        try:
+            df.to_parquet(self.features_enumerator_parquet, engine='pyarrow',
+                          compression='zstd', index=False)
+        except ImportError:
+            self.feature_extractor.save_features(df, config.FEATURES_ENUMERATOR_CSV)
+            return
+        
+        with open(self.features_sources_path, 'w') as f:
+            json.dump(signatures, f)
+    
     def combine_all_features(self) -> pd.DataFrame:
         """
         Combine features from all datasets (clean, noisy, enumerator).
@@ -90,33 +341,42 @@ class RetrainService:
         
         # Load clean features if exists
         if config.FEATURES_CLEAN_CSV.exists():
-            df_clean = pd.read_csv(config.FEATURES_CLEAN_CSV)
+            df_clean = _read_feature_csv(config.FEATURES_CLEAN_CSV)
             dfs.append(df_clean)
             print(f"Loaded {len(df_clean)} samples from clean dataset")
         
         # Load noisy features if exists
         if config.FEATURES_NOISY_CSV.exists():
-            df_noisy = pd.read_csv(config.FEATURES_NOISY_CSV)
+            df_noisy = _read_feature_csv(config.FEATURES_NOISY_CSV)
             dfs.append(df_noisy)
             print(f"Loaded {len(df_noisy)} samples from noisy dataset")
         
-        # Load enumerator features if exists
-        if config.FEATURES_ENUMERATOR_CSV.exists():
-            df_enum = pd.read_csv(config.FEATURES_ENUMERATOR_CSV)
+        # Load enumerator features if exists (CSV is the legacy format)
+        df_enum = None
+        if self.features_enumerator_parquet.exists():
+            df_enum = _read_feature_parquet(self.features_enumerator_parquet)
+        elif config.FEATURES_ENUMERATOR_CSV.exists():
+            df_enum = _read_feature_csv(config.FEATURES_ENUMERATOR_CSV)
+        if df_enum is not None:
             dfs.append(df_enum)
             print(f"Loaded {len(df_enum)} samples from enumerator dataset")
         
         if not dfs:
             raise ValueError("No feature datasets found")
         
+        # Hash filenames of datasets saved without the column
+        for df in dfs:
+            if 'fname_hash' not in df.columns:
+                df['fname_hash'] = _filename_hashes(df['filename'])
+        
         # Combine all dataframes
         combined_df = pd.concat(dfs, ignore_index=True)
         
-        # Remove duplicates if any
-        combined_df = combined_df.drop_duplicates(subset=['filename'], keep='last')
+        # Remove duplicates if any (uint64 hashes instead of Python strings)
+        combined_df = combined_df.drop_duplicates(subset=['fname_hash'], keep='last')
         
         print(f"Total combined samples: {len(combined_df)}")
-        print(f"Unique speakers: {len(combined_df['label'].unique())}")
+        print(f"Unique speakers: {combined_df['label'].nunique()}")
         
         return combined_df
     
@@ -161,8 +421,8 @@ class RetrainService:
             
             # Step 3: Prepare data for training
             print("Step 3: Preparing training data...")
-            feature_columns = [col for col in combined_df.columns if col.startswith('mfcc_')]
-            X = combined_df[feature_columns].values
+            feature_columns = _mfcc_columns(combined_df.columns)
+            X = combined_df[feature_columns].to_numpy(dtype=np.float32, copy=False)
             y = combined_df['label'].values
             
             # Step 4: Preprocess data
@@ -171,14 +431,9 @@ class RetrainService:
             
             # Step 5: Train model
             print("Step 5: Training Random Forest model...")
-            from sklearn.model_selection import train_test_split
-            
-            X_train, X_test, y_train, y_test = train_test_split(
-                X_processed, y_processed, 
-                test_size=0.2, 
-                random_state=42, 
-                stratify=y_processed
-            )
+            train_idx, test_idx = _stratified_split(np.asarray(y_processed), test_size=0.2, seed=42)
+            X_train, X_test = X_processed[train_idx], X_processed[test_idx]
+            y_train, y_test = y_processed[train_idx], y_processed[test_idx]
             
             self.trainer.train(X_train, y_train, n_estimators=100, max_depth=20)
             
@@ -187,6 +442,9 @@ class RetrainService:
             train_metrics = self.trainer.evaluate(X_train, y_train)
             test_metrics = self.trainer.evaluate(X_test, y_test)
             
+            # Steps 7-8 persist only after evaluation succeeded, so a failed
+            # retrain leaves the previous model and enumerator list in place
+            
             # Step 7: Save model
             print("Step 7: Saving model...")
             self.trainer.save_model()
@@ -197,9 +455,8 @@ class RetrainService:
             
             # Step 9: Mark registrations as processed
             print("Step 9: Updating registration status...")
-            pending = self.registration_service.get_pending_retrains()
-            for reg in pending:
-                self.registration_service.mark_retrain_complete(reg['speaker_id'])
+            pending_speaker_ids = self.registration_service.get_pending_speaker_ids()
+            self.registration_service.mark_retrain_complete_bulk(pending_speaker_ids)
             
             # Calculate training duration
             end_time = datetime.now()
@@ -228,7 +485,7 @@ class RetrainService:
                 'n_classes': len(self.trainer.label_encoder.classes_),
                 'n_samples': len(combined_df),
                 'duration_seconds': duration,
-                'new_registrations_processed': len(pending)
+                'new_registrations_processed': len(pending_speaker_ids)
             }
         
         except Exception as e:
@@ -251,21 +508,21 @@ class RetrainService:
     
     def _update_enumerator_list(self, df: pd.DataFrame):
         """Update enumerator list JSON with all speakers."""
-        enumerator_list = {}
+        # Samples per speaker in one groupby pass
+        sizes = df.groupby('label', sort=False).size()
+        last_updated = datetime.now().isoformat()
         
-        # Group by speaker
-        for speaker_id in df['label'].unique():
-            speaker_df = df[df['label'] == speaker_id]
-            
-            enumerator_list[speaker_id] = {
+        enumerator_list = {
+            speaker_id: {
                 'speaker_id': speaker_id,
-                'n_samples': len(speaker_df),
-                'last_updated': datetime.now().isoformat()
+                'n_samples': int(n_samples),
+                'last_updated': last_updated
             }
+            for speaker_id, n_samples in sizes.items()
+        }
         
         # Save to JSON
-        with open(config.ENUMERATOR_LIST_PATH, 'w') as f:
-            json.dump(enumerator_list, f, indent=2)
+        write_enumerator_snapshot(config.ENUMERATOR_LIST_PATH, enumerator_list)
         
         print(f"Updated enumerator list with {len(enumerator_list)} speakers")
     
@@ -273,23 +530,22 @@ class RetrainService:
                      n_classes: int, n_samples: int, duration: float,
                      status: str, error_message: str = None):
         """Log retrain history to CSV."""
-        log_data = {
-            'timestamp': datetime.now().isoformat(),
-            'status': status,
-            'train_accuracy': train_accuracy,
-            'test_accuracy': test_accuracy,
-            'n_classes': n_classes,
-            'n_samples': n_samples,
-            'duration_seconds': duration,
-            'error_message': error_message if error_message else ''
-        }
-        
-        # Create or append to CSV
-        df = pd.DataFrame([log_data])
-        if self.retrain_history_log.exists():
-            df.to_csv(self.retrain_history_log, mode='a', header=False, index=False)
-        else:
-            df.to_csv(self.retrain_history_log, index=False)
+        row = [
+            datetime.now().isoformat(),
+            status,
+            train_accuracy,
+            test_accuracy,
+            n_classes,
+            n_samples,
+            duration,
+            # One physical line per row keeps the log readable from its tail
+            ' '.join(error_message.splitlines()) if error_message else ''
+        ]
+        get_csv_appender(self.retrain_history_log, RETRAIN_HISTORY_COLUMNS).append(row)
+        _latest_retrain[str(self.retrain_history_log)] = (
+            _history_signature(self.retrain_history_log),
+            _history_record(RETRAIN_HISTORY_COLUMNS, row)
+        )
     
     def _save_metrics_to_db(self, train_metrics: Dict, test_metrics: Dict, n_samples: int):
         """Save training metrics to database."""
@@ -299,10 +555,10 @@ class RetrainService:
                 accuracy=test_metrics['accuracy'],
                 n_classes=self.trainer.metadata.get('n_classes', 0),
                 n_samples=n_samples,
-                metrics_json=json.dumps({
+                metrics_json=json_dumps({
                     'train_metrics': train_metrics,
                     'test_metrics': test_metrics
-                })
+                }).decode('utf-8')
             )
             
             self.db.add(metrics)
@@ -325,17 +581,42 @@ class RetrainService:
         if not self.retrain_history_log.exists():
             return []
         
+        if limit == 1:
+            latest = self._latest_retrain_record()
+            return [latest] if latest else []
+        if limit <= 0:
+            return []
+        
         try:
-            df = pd.read_csv(self.retrain_history_log)
-            df = df.sort_values('timestamp', ascending=False)
-            df = df.head(limit)
-            
-            return df.to_dict('records')
+            # Rows are appended in time order, so the tail is the newest
+            header, rows = _tail_history(self.retrain_history_log, limit)
+            return [_history_record(header, row) for row in rows]
         
         except Exception as e:
             print(f"Error reading retrain history: {e}")
             return []
     
+    def _latest_retrain_record(self) -> Optional[Dict]:
+        """
+        Newest history record, cached per log file until the file changes;
+        the log is append-only, so the newest record is its last row.
+        """
+        key = str(self.retrain_history_log)
+        signature = _history_signature(self.retrain_history_log)
+        cached = _latest_retrain.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        try:
+            header, rows = _tail_history(self.retrain_history_log, 1)
+        except Exception as e:
+            print(f"Error reading retrain history: {e}")
+            return None
+        
+        record = _history_record(header, rows[0]) if rows else None
+        _latest_retrain[key] = (signature, record)
+        return record
+    
     def get_model_performance(self) -> Dict:
         """
         Get current model performance metrics.
@@ -1,27 +1,95 @@
 # smartcapi-backend/app/services/user_service.py
 
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+import bcrypt
+import jwt
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
-from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Tuple
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from collections import OrderedDict
+import asyncio
+import hashlib
+import hmac
 import secrets
+import threading
+import time
 
 from ..core import config
 from ..model.tables import User, PasswordResetToken, UserRole
 from ..schemas.auth import UserCreate
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost for new hashes; hashes below it are upgraded on login
+BCRYPT_ROUNDS = getattr(config, 'BCRYPT_ROUNDS', 12)
+
+# JWT signing settings, resolved once
+_JWT_ALGORITHMS = [config.ALGORITHM]
+_JWT_KEY = config.SECRET_KEY.encode() if isinstance(config.SECRET_KEY, str) else config.SECRET_KEY
+
+# Decoded JWT payloads keyed by raw token: token -> (cache expiry, payload)
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+# Recently verified (password, hash) pairs: HMAC of the pair -> (cache expiry, hash).
+# Keyed by HMAC so no plaintext password is kept in memory; only successes are cached.
+_verified_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+_verified_cache_lock = threading.Lock()
+
+def _bcrypt_secret(password: str) -> bytes:
+    # bcrypt only uses the first 72 bytes; truncate like passlib did
+    return password.encode('utf-8')[:72]
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    key = hmac.new(_JWT_KEY, plain_password.encode('utf-8') + b'\0' + hashed_password.encode('utf-8'),
+                   hashlib.sha256).digest()
+    now = time.monotonic()
+    with _verified_cache_lock:
+        cached = _verified_cache.get(key)
+        if cached is not None:
+            if cached[0] > now:
+                _verified_cache.move_to_end(key)
+                return True
+            del _verified_cache[key]
+
+    try:
+        valid = bcrypt.checkpw(_bcrypt_secret(plain_password), hashed_password.encode('ascii'))
+    except (ValueError, UnicodeEncodeError):
+        # Not a bcrypt hash
+        return False
+
+    if valid:
+        with _verified_cache_lock:
+            _verified_cache[key] = (now + getattr(config, 'PASSWORD_CACHE_TTL_SECONDS', 60), hashed_password)
+            _verified_cache.move_to_end(key)
+            if len(_verified_cache) > getattr(config, 'PASSWORD_CACHE_SIZE', 256):
+                _verified_cache.popitem(last=False)
+    return valid
+
+def _forget_verified_password(hashed_password: str):
+    """Drop cached verifications against a hash that is being replaced."""
+    with _verified_cache_lock:
+        for key in [k for k, (_, h) in _verified_cache.items() if h == hashed_password]:
+            del _verified_cache[key]
 
 def get_password_hash(password: str) -> str:
     """Hash password using bcrypt."""
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(_bcrypt_secret(password), bcrypt.gensalt(BCRYPT_ROUNDS)).decode('ascii')
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify the password; on success also return a new hash if the stored one is outdated."""
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    # Modular crypt format: $2b$<cost>$<salt+digest>
+    prefix, _, rest = hashed_password[1:].partition('$')
+    cost = rest.partition('$')[0]
+    if prefix != '2b' or not cost.isdigit() or int(cost) < BCRYPT_ROUNDS:
+        return True, get_password_hash(plain_password)
+    return True, None
+
+def _reset_token_hash(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -31,38 +99,92 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, config.SECRET_KEY, algorithm=config.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGORITHMS[0])
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[dict]:
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+        if cached is not None:
+            if cached[0] > now:
+                _token_cache.move_to_end(token)
+                return dict(cached[1])
+            del _token_cache[token]
+
     try:
-        payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
-        return payload
-    except JWTError:
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS,
+                             options={"require": ["exp"]})
+    except jwt.InvalidTokenError:
         return None
 
+    # Only the decode result is cached, never for longer than the token is valid
+    ttl = getattr(config, 'TOKEN_CACHE_TTL_SECONDS', 60)
+    exp = payload.get("exp")
+    if ttl > 0 and isinstance(exp, (int, float)) and exp > now:
+        with _token_cache_lock:
+            _token_cache[token] = (min(now + ttl, exp), payload)
+            _token_cache.move_to_end(token)
+            if len(_token_cache) > getattr(config, 'TOKEN_CACHE_SIZE', 4096):
+                _token_cache.popitem(last=False)
+    return dict(payload)
+
 class UserService:
     """Service for user management and authentication."""
     
     def __init__(self, db: Session):
         self.db = db
+        # Users loaded through this service, held strongly so that repeat
+        # lookups by any key within one request skip the query
+        self._by_id: Dict[int, User] = {}
+        self._by_username: Dict[str, User] = {}
+        self._by_email: Dict[str, User] = {}
+    
+    def _remember(self, user: Optional[User]) -> Optional[User]:
+        if user is not None:
+            self._by_id[user.id] = user
+            self._by_username[user.username] = user
+            self._by_email[user.email] = user
+        return user
+    
+    def _forget(self, user: User):
+        self._by_id.pop(user.id, None)
+        self._by_username.pop(user.username, None)
+        self._by_email.pop(user.email, None)
     
     def get_user_by_id(self, user_id: int) -> Optional[User]:
-        return self.db.query(User).filter(User.id == user_id).first()
+        user = self._by_id.get(user_id)
+        if user is None:
+            user = self._remember(self.db.query(User).filter(User.id == user_id).first())
+        return user
     
     def get_user_by_username(self, username: str) -> Optional[User]:
-        return self.db.query(User).filter(User.username == username).first()
+        user = self._by_username.get(username)
+        if user is None:
+            user = self._remember(self.db.query(User).filter(User.username == username).first())
+        return user
     
     def get_user_by_email(self, email: str) -> Optional[User]:
-        return self.db.query(User).filter(User.email == email).first()
+        user = self._by_email.get(email)
+        if user is None:
+            user = self._remember(self.db.query(User).filter(User.email == email).first())
+        return user
 
-    def get_all_users(self, skip: int = 0, limit: int = 100) -> List[User]:
-        return self.db.query(User).offset(skip).limit(limit).all()
+    def get_all_users(self, after_id: int = 0, limit: int = 100) -> Tuple[List[User], Optional[int]]:
+        """One page of users ordered by id, plus the cursor for the next page (None when done)."""
+        users = self.db.query(User).filter(User.id > after_id).order_by(User.id).limit(limit).all()
+        next_cursor = users[-1].id if len(users) == limit else None
+        return users, next_cursor
 
     def create_user(self, user: UserCreate) -> User:
-        if self.get_user_by_username(user.username):
+        # Both columns are unique, so at most two rows can match: each probe
+        # is a lookup on the unique index and no full User row is loaded
+        existing = self.db.query(User.username, User.email).filter(
+            or_(User.username == user.username, User.email == user.email)
+        ).limit(2).all()
+        if any(row.username == user.username for row in existing):
             raise ValueError(f"Username '{user.username}' already exists")
-        if self.get_user_by_email(user.email):
+        if existing:
             raise ValueError(f"Email '{user.email}' already exists")
 
         hashed_password = get_password_hash(user.password)
@@ -78,12 +200,42 @@ class UserService:
         self.db.add(db_user)
         self.db.commit()
         self.db.refresh(db_user)
-        return db_user
+        return self._remember(db_user)
 
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
-        user = self.get_user_by_username(username)
-        if not user or not verify_password(password, user.password):
+        user = self._get_login_user(username)
+        if not user:
+            return None
+        valid, new_hash = _verify_and_update(password, user.password)
+        return self._finish_login(user, valid, new_hash)
+
+    async def authenticate_user_async(self, username: str, password: str) -> Optional[User]:
+        """authenticate_user for async endpoints: bcrypt runs in the default executor."""
+        user = self._get_login_user(username)
+        if not user:
+            return None
+        valid, new_hash = await asyncio.get_running_loop().run_in_executor(
+            None, _verify_and_update, password, user.password
+        )
+        return self._finish_login(user, valid, new_hash)
+
+    def _get_login_user(self, username: str) -> Optional[User]:
+        user = self._by_username.get(username)
+        if user is None:
+            # Only the columns login needs; the partial object is not memoized
+            user = self.db.query(User).options(
+                load_only(User.id, User.username, User.password, User.role)
+            ).filter(User.username == username).first()
+        return user
+
+    def _finish_login(self, user: User, valid: bool, new_hash: Optional[str]) -> Optional[User]:
+        if not valid:
             return None
+        if new_hash:
+            # Stored hash used an older cost or scheme; replace it while we have the password
+            _forget_verified_password(user.password)
+            user.password = new_hash
+            self.db.commit()
         return user
 
     def update_user(self, user_id: int, **kwargs) -> Optional[User]:
@@ -92,35 +244,53 @@ class UserService:
             return None
         
         allowed_fields = ['email', 'full_name', 'phone', 'role', 'voice_sample_path']
+        self._forget(user)
         for key, value in kwargs.items():
             if key in allowed_fields and value is not None:
                 setattr(user, key, value)
         
         self.db.commit()
         self.db.refresh(user)
-        return user
+        return self._remember(user)
 
     def delete_user(self, user_id: int) -> bool:
         user = self.get_user_by_id(user_id)
         if not user:
             return False
         
+        self._forget(user)
         self.db.delete(user)
         self.db.commit()
         return True
 
     def create_password_reset_token(self, user: User) -> str:
         token = secrets.token_urlsafe(32)
+        token_hash = _reset_token_hash(token)
         expires = datetime.utcnow() + timedelta(hours=1)
         
+        # One upsert round-trip on backends with ON CONFLICT (user_id is unique)
+        insert = {'postgresql': pg_insert, 'sqlite': sqlite_insert}.get(self.db.get_bind().dialect.name)
+        if insert is not None:
+            stmt = insert(PasswordResetToken).values(
+                user_id=user.id,
+                token_hash=token_hash,
+                expires_at=expires
+            )
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=['user_id'],
+                set_={'token_hash': stmt.excluded.token_hash, 'expires_at': stmt.excluded.expires_at}
+            ))
+            self.db.commit()
+            return token
+        
         reset_token_obj = self.db.query(PasswordResetToken).filter_by(user_id=user.id).first()
         if reset_token_obj:
-            reset_token_obj.token = token
+            reset_token_obj.token_hash = token_hash
             reset_token_obj.expires_at = expires
         else:
             reset_token_obj = PasswordResetToken(
                 user_id=user.id,
-                token=token,
+                token_hash=token_hash,
                 expires_at=expires
             )
             self.db.add(reset_token_obj)
@@ -129,12 +299,16 @@ class UserService:
         return token
 
     def get_user_by_password_reset_token(self, token: str) -> Optional[User]:
-        reset_token_obj = self.db.query(PasswordResetToken).filter_by(token=token).first()
-        if not reset_token_obj or reset_token_obj.expires_at < datetime.utcnow():
+        token_hash = _reset_token_hash(token)
+        reset_token_obj = self.db.query(PasswordResetToken).filter_by(token_hash=token_hash).first()
+        if not reset_token_obj or not secrets.compare_digest(reset_token_obj.token_hash, token_hash):
+            return None
+        if reset_token_obj.expires_at < datetime.utcnow():
             return None
         return reset_token_obj.user
 
     def reset_password(self, user: User, new_password: str) -> bool:
+        _forget_verified_password(user.password)
         user.password = get_password_hash(new_password)
         
         # Delete the reset token after use
@@ -146,10 +320,11 @@ class UserService:
         return True
 
 
-def get_current_user(db: Session, token: str) -> Optional[User]:
+def get_current_user(db: Session, token: str,
+                     user_service: Optional[UserService] = None) -> Optional[User]:
     payload = verify_token(token)
     if not payload or "sub" not in payload:
         return None
     username = payload["sub"]
-    user_service = UserService(db)
+    user_service = user_service or UserService(db)
     return user_service.get_user_by_username(username)
@@ -7,6 +7,9 @@ from pathlib import Path
 
 import pytest
 
+# Modules loaded through the load_module fixture, keyed by resolved file path
+_MODULE_CACHE: dict = {}
+
 def project_root():
     """
     Cari root repository berdasarkan lokasi file tests ini.
@@ -73,5 +76,35 @@ def load_module(repo_root):
         p = repo_root / "smartcapi-backend" / rel_path
         if not p.exists():
             raise FileNotFoundError(f"Module file tidak ditemukan: {p}")
-        return load_module_from_path(p, name)
-    return _loader
\ No newline at end of file
+        key = p.resolve()
+        module = _MODULE_CACHE.get(key)
+        if module is None:
+            module = _MODULE_CACHE[key] = load_module_from_path(p, name)
+            # Supaya pickle / import berdasarkan nama menemukan modul ini
+            sys.modules.setdefault(name, module)
+        return module
+    return _loader
+
+# Direktori app/ (berisi services/, utils/, model/, ...)
+APP_DIR = Path(__file__).resolve().parents[1]
+
+def stub_module(name: str, **attrs) -> types.ModuleType:
+    """Modul pengganti untuk dependensi yang tidak ada di environment tes."""
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+@pytest.fixture
+def load_app_module(monkeypatch):
+    """
+    Fixture helper untuk memuat modul dari app/ dengan sebagian import diganti stub
+    (mis. config dan api.database yang tidak ada di environment tes).
+    Stub hanya berlaku selama satu tes; modul selalu dimuat ulang.
+    Usage: mod = load_app_module('services/registration_service.py', {'config': cfg})
+    """
+    def _loader(rel_path: str, stubs: dict = None):
+        for mod_name, module in (stubs or {}).items():
+            monkeypatch.setitem(sys.modules, mod_name, module)
+        name = "app_" + rel_path[:-3].replace("/", "_")
+        return load_module_from_path(APP_DIR / rel_path, name)
+    return _loader
@@ -0,0 +1,107 @@
+import shutil
+import sys
+
+import pytest
+
+from conftest import APP_DIR, load_module_from_path, stub_module
+
+np = pytest.importorskip("numpy")
+joblib = pytest.importorskip("joblib")
+
+
+def fake_compilers(monkeypatch, fail=False):
+    """Pasang stub treelite/tl2cgen; export_lib menulis file .so palsu."""
+    def export_lib(model, toolchain, libpath, params):
+        if fail:
+            with open(libpath, "wb") as f:
+                f.write(b"setengah")
+            raise RuntimeError("kompilasi gagal")
+        with open(libpath, "wb") as f:
+            f.write(b"library")
+
+    treelite = stub_module("treelite", sklearn=stub_module("treelite.sklearn", import_model=lambda m: m))
+    monkeypatch.setitem(sys.modules, "treelite", treelite)
+    monkeypatch.setitem(sys.modules, "tl2cgen", stub_module("tl2cgen", export_lib=export_lib))
+
+
+@pytest.fixture
+def train_model(load_app_module):
+    pytest.importorskip("sklearn")
+    pytest.importorskip("pandas")
+    return load_app_module("training/train_model.py")
+
+
+def test_export_stamps_library_with_model_fingerprint(tmp_path, train_model, monkeypatch):
+    model_path = tmp_path / "model.pkl"
+    model_path.write_bytes(b"model-v1")
+    fake_compilers(monkeypatch)
+
+    libpath = train_model.export_compiled_model(object(), str(model_path))
+
+    assert libpath == str(tmp_path / "model.so")
+    stamp = (tmp_path / "model.so.source").read_text()
+    assert stamp == train_model.model_fingerprint(str(model_path))
+
+
+def test_skipped_export_removes_stale_library(tmp_path, train_model, monkeypatch):
+    """Tanpa treelite/tl2cgen, library dari model sebelumnya harus dihapus."""
+    model_path = tmp_path / "model.pkl"
+    (tmp_path / "model.so").write_bytes(b"library-lama")
+    (tmp_path / "model.so.source").write_text("lama")
+    monkeypatch.setitem(sys.modules, "tl2cgen", None)
+
+    assert train_model.export_compiled_model(object(), str(model_path)) is None
+    assert not (tmp_path / "model.so").exists()
+    assert not (tmp_path / "model.so.source").exists()
+
+
+def test_failed_export_leaves_no_stamp(tmp_path, train_model, monkeypatch):
+    model_path = tmp_path / "model.pkl"
+    model_path.write_bytes(b"model-v2")
+    (tmp_path / "model.so.source").write_text(train_model.model_fingerprint(str(model_path)))
+    fake_compilers(monkeypatch, fail=True)
+
+    with pytest.raises(RuntimeError):
+        train_model.export_compiled_model(object(), str(model_path))
+    assert not (tmp_path / "model.so.source").exists()
+
+
+@pytest.fixture
+def speaker_dir(tmp_path, monkeypatch):
+    """Salinan infer_speaker.py dengan model, scaler dan library .so palsu di sebelahnya."""
+    shutil.copy(APP_DIR / "model" / "speaker_id" / "infer_speaker.py", tmp_path / "infer_speaker.py")
+    joblib.dump({"model": None, "classes_": np.array(["ani", "budi"])}, tmp_path / "random_forest_model.pkl")
+    joblib.dump({"scaler": None}, tmp_path / "feature_scaler.pkl")
+    (tmp_path / "random_forest_model.so").write_bytes(b"library")
+
+    class Predictor:
+        def __init__(self, path):
+            self.path = path
+
+    monkeypatch.setitem(sys.modules, "tl2cgen", stub_module("tl2cgen", Predictor=Predictor))
+    return tmp_path
+
+
+def load_infer_speaker(speaker_dir):
+    return load_module_from_path(speaker_dir / "infer_speaker.py", "infer_speaker_copy")
+
+
+def test_library_with_matching_stamp_is_loaded(speaker_dir):
+    import hashlib
+    digest = hashlib.sha256((speaker_dir / "random_forest_model.pkl").read_bytes()).hexdigest()
+    (speaker_dir / "random_forest_model.so.source").write_text(digest)
+
+    module = load_infer_speaker(speaker_dir)
+
+    assert module.compiled_model.path == str(speaker_dir / "random_forest_model.so")
+
+
+@pytest.mark.parametrize("stamp", [None, "dari-model-lama"])
+def test_stale_library_is_ignored(speaker_dir, stamp):
+    """Library tanpa stempel atau dari model lain tidak boleh dipakai untuk prediksi."""
+    if stamp is not None:
+        (speaker_dir / "random_forest_model.so.source").write_text(stamp)
+
+    module = load_infer_speaker(speaker_dir)
+
+    assert module.compiled_model is None
@@ -0,0 +1,28 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("librosa")
+pytest.importorskip("torch")
+pytest.importorskip("torchaudio")
+
+
+@pytest.fixture
+def feature_utils(load_app_module, monkeypatch):
+    module = load_app_module("utils/feature_utils.py")
+    monkeypatch.setattr(module, "MFCC_BACKEND", "torchaudio")
+    return module
+
+
+def test_mfcc_batch_matches_single_clip(feature_utils):
+    """top_db=80 harus dihitung per klip: klip pelan tidak boleh terpotong oleh klip keras."""
+    rng = np.random.default_rng(0)
+    t = np.arange(16000, dtype=np.float32) / 16000
+    loud = (0.9 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    quiet = (1e-4 * rng.standard_normal(16000)).astype(np.float32)
+    fu = feature_utils.FeatureUtils
+
+    batch = fu.extract_mfcc_batch([loud, quiet])
+
+    assert batch.shape[0] == 2
+    for clip, features in zip((loud, quiet), batch):
+        np.testing.assert_allclose(features, fu.extract_mfcc(clip), rtol=1e-4, atol=1e-3)
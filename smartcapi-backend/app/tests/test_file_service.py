@@ -0,0 +1,140 @@
+import hashlib
+import json
+import threading
+import time
+
+import pytest
+
+from conftest import stub_module
+
+
+class FakeLogger:
+    def info(self, *args, **kwargs):
+        pass
+
+    def error(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture
+def file_service(tmp_path, load_app_module):
+    """Muat services/file_service.py dengan semua direktori di tmp_path."""
+    dirs = {name: tmp_path / name.lower() for name in (
+        "BASE_DIR", "DATASET_DIR", "CLEAN_AUDIO_DIR", "NOISY_AUDIO_DIR", "UPLOADS_DIR",
+        "REGISTRATION_DIR", "TEMP_DIR", "MODEL_DIR", "LOGS_DIR", "FEATURE_DIR",
+    )}
+    stubs = {
+        "config": stub_module("config", **dirs),
+        "services": stub_module("services"),
+        "services.logging_service": stub_module(
+            "services.logging_service",
+            get_logger=FakeLogger,
+            LogCategory=stub_module("LogCategory", FILE="file"),
+        ),
+    }
+    return load_app_module("services/file_service.py", stubs)
+
+
+def test_search_by_hash_finds_upload_still_being_hashed(file_service, monkeypatch):
+    """Upload baru harus ditemukan walaupun hash-nya masih dihitung di background."""
+    release = threading.Event()
+    hash_path = file_service.FileService._hash_path
+
+    def slow_hash_path(self, path):
+        release.wait(timeout=5)
+        return hash_path(self, path)
+
+    monkeypatch.setattr(file_service.FileService, "_hash_path", slow_hash_path)
+    service = file_service.FileService()
+    upload = service.save_uploaded_file(b"halo", "a.wav", "audio")
+    assert service.file_registry[upload["file_path"]]["hash"] is None
+
+    threading.Timer(0.1, release.set).start()
+    matches = service.search_by_hash(hashlib.sha256(b"halo").hexdigest())
+
+    assert matches == [upload["file_path"]]
+
+
+def test_search_by_hash_hashes_entries_saved_without_hash(tmp_path, file_service):
+    """Entri registry yang tersimpan tanpa hash (mis. sebelum restart) dihitung saat dicari."""
+    audio = tmp_path / "uploads" / "b.wav"
+    audio.parent.mkdir(parents=True, exist_ok=True)
+    audio.write_bytes(b"rekaman")
+    metadata = tmp_path / "logs_dir" / "file_metadata.json"
+    metadata.parent.mkdir(parents=True, exist_ok=True)
+    metadata.write_text(json.dumps({str(audio): {"name": "b.wav", "hash": None}}))
+
+    service = file_service.FileService()
+
+    assert service.search_by_hash(hashlib.sha256(b"rekaman").hexdigest()) == [str(audio)]
+    assert file_service.FileService().file_registry[str(audio)]["hash"] is not None
+
+
+def test_registry_is_loaded_on_first_access(tmp_path, file_service, monkeypatch):
+    metadata = tmp_path / "logs_dir" / "file_metadata.json"
+    metadata.parent.mkdir(parents=True, exist_ok=True)
+    metadata.write_text(json.dumps({"a.wav": {"hash": "abc"}}))
+    loads = []
+    load = file_service.FileService._load_file_registry
+    monkeypatch.setattr(file_service.FileService, "_load_file_registry",
+                        lambda self: loads.append(1) or load(self))
+
+    service = file_service.FileService()
+    assert loads == []
+
+    assert service.search_by_hash("abc") == ["a.wav"]
+    assert service.file_registry == {"a.wav": {"hash": "abc"}}
+    assert loads == [1]
+
+
+def count_registry_saves(file_service, monkeypatch):
+    saves = []
+    save = file_service.FileService._save_file_registry
+    monkeypatch.setattr(file_service.FileService, "_save_file_registry",
+                        lambda self: saves.append(1) or save(self))
+    return saves
+
+
+def test_backfilling_many_hashes_saves_registry_once(tmp_path, file_service, monkeypatch):
+    uploads = tmp_path / "uploads"
+    uploads.mkdir(parents=True, exist_ok=True)
+    registry = {}
+    for i in range(5):
+        audio = uploads / f"{i}.wav"
+        audio.write_bytes(f"rekaman {i}".encode())
+        registry[str(audio)] = {"name": audio.name, "hash": None}
+    metadata = tmp_path / "logs_dir" / "file_metadata.json"
+    metadata.parent.mkdir(parents=True, exist_ok=True)
+    metadata.write_text(json.dumps(registry))
+    saves = count_registry_saves(file_service, monkeypatch)
+
+    service = file_service.FileService()
+    assert service.search_by_hash(hashlib.sha256(b"rekaman 3").hexdigest()) == [str(uploads / "3.wav")]
+
+    assert saves == [1]
+    saved = json.loads(metadata.read_text())
+    assert all(info["hash"] is not None for info in saved.values())
+
+
+def test_burst_of_upload_hashes_is_saved_when_the_last_finishes(file_service, monkeypatch):
+    release = threading.Event()
+    hash_path = file_service.FileService._hash_path
+
+    def slow_hash_path(self, path):
+        release.wait(timeout=5)
+        return hash_path(self, path)
+
+    monkeypatch.setattr(file_service.FileService, "_hash_path", slow_hash_path)
+    service = file_service.FileService()
+    uploads = [service.save_uploaded_file(f"isi {i}".encode(), f"{i}.wav", "audio") for i in range(4)]
+    saves = count_registry_saves(file_service, monkeypatch)
+
+    release.set()
+    for upload in uploads:
+        assert service.wait_for_hash(upload["file_path"], timeout=5) is not None
+
+    # Worker menyimpan registry sekali setelah hash terakhir selesai
+    deadline = time.monotonic() + 5
+    while not saves and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert saves == [1]
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from conftest import stub_module
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+
+
+class FakePredictor:
+    """SpeakerPredictor pengganti; setiap instance berarti model dimuat ulang."""
+
+    loads = 0
+
+    def __init__(self):
+        FakePredictor.loads += 1
+        self.enumerator_list = {}
+
+
+@pytest.fixture
+def inference(tmp_path, load_app_module):
+    """Muat services/inference_service.py dengan model dan tabel diganti stub."""
+    FakePredictor.loads = 0
+    config = stub_module(
+        "config",
+        MODEL_PATH=tmp_path / "model.pkl",
+        SCALER_PATH=tmp_path / "scaler.pkl",
+        METADATA_PATH=tmp_path / "metadata.json",
+        ENUMERATOR_LIST_PATH=tmp_path / "enumerators.json",
+    )
+    for path in (config.MODEL_PATH, config.SCALER_PATH, config.METADATA_PATH):
+        path.write_bytes(b"v1")
+    tables = stub_module("app.model.tables", Interview=None, AudioFile=None,
+                         TranscriptionSegment=None, UserRole=None, InterviewStatus=None)
+    stubs = {
+        "config": config,
+        "app": stub_module("app"),
+        "app.model": stub_module("app.model"),
+        "app.model.tables": tables,
+        "utils": stub_module("utils"),
+        "utils.audio_utils": stub_module("utils.audio_utils", AudioUtils=None),
+        "utils.feature_utils": stub_module("utils.feature_utils", extract_all_features=None),
+        "inference": stub_module("inference"),
+        "inference.infer_speaker": stub_module("inference.infer_speaker", SpeakerPredictor=FakePredictor),
+        "services": stub_module("services"),
+        "services.whisper_service": stub_module("services.whisper_service", WhisperTranscriber=object),
+        "services.logging_service": stub_module("services.logging_service", get_logger=lambda: None),
+        "services.registration_service": stub_module(
+            "services.registration_service", read_enumerator_list=read_enumerator_list
+        ),
+    }
+    return load_app_module("services/inference_service.py", stubs)
+
+
+def read_enumerator_list(list_path):
+    """Pengganti registration_service.read_enumerator_list (snapshot + journal)."""
+    enumerators = json.loads(list_path.read_text()) if list_path.exists() else {}
+    journal = list_path.with_suffix(".jsonl")
+    if journal.exists():
+        for line in journal.read_text().splitlines():
+            change = json.loads(line)
+            enumerators[change["id"]] = change["data"]
+    return enumerators, 0
+
+
+def test_services_share_loaded_speaker_model(inference):
+    first, second = inference.InferenceService(), inference.InferenceService()
+
+    assert first.speaker_predictor is second.speaker_predictor
+    assert FakePredictor.loads == 1
+
+
+def test_retrained_model_is_picked_up(inference):
+    """Setelah retrain menulis ulang file model, service berikutnya memuat model baru."""
+    before = inference.InferenceService().speaker_predictor
+
+    inference.config.MODEL_PATH.write_bytes(b"model hasil retrain")
+    after = inference.InferenceService().speaker_predictor
+
+    assert after is not before
+    assert FakePredictor.loads == 2
+    assert inference.InferenceService().speaker_predictor is after
+
+
+def test_enumerators_registered_after_startup_are_recognised(inference):
+    list_path = inference.config.ENUMERATOR_LIST_PATH
+    list_path.write_text(json.dumps({"enum_1_ani": {}}))
+    service = inference.InferenceService()
+    assert service._enum_ids == {"enum_1_ani"}
+
+    # Registrasi baru masuk ke journal; retrain menulis snapshot baru
+    list_path.with_suffix(".jsonl").write_text(json.dumps({"op": "add", "id": "enum_2_budi", "data": {}}) + "\n")
+    assert service._enum_ids == {"enum_1_ani", "enum_2_budi"}
+
+    list_path.write_text(json.dumps({"enum_1_ani": {}, "enum_2_budi": {}, "enum_3_citra": {}}))
+    list_path.with_suffix(".jsonl").unlink()
+    assert inference.InferenceService()._enum_ids == {"enum_1_ani", "enum_2_budi", "enum_3_citra"}
+
+
+class FlakyTranscriber:
+    """Whisper pengganti: batch selalu gagal, klip dengan sampel negatif juga gagal."""
+
+    def transcribe_batch(self, audios, sr, language="id"):
+        raise RuntimeError("CUDA out of memory")
+
+    def transcribe_array(self, audio, sr, language="id"):
+        if audio.min() < 0:
+            raise ValueError("klip rusak")
+        return {"success": True, "text": f"teks {audio[0]:.0f}", "language": language}
+
+
+def test_failed_batch_falls_back_to_single_groups(inference):
+    service = inference.InferenceService()
+    service.transcriber = FlakyTranscriber()
+    groups = [{"group_index": i} for i in range(3)]
+    audios = [np.full(4, 1.0), np.full(4, -1.0), np.full(4, 3.0)]
+
+    results = service._transcribe_groups(groups, audios, 16000)
+
+    # Hanya grup yang gagal sendiri yang dilewati
+    assert [r and r["text"] for r in results] == ["teks 1", None, "teks 3"]
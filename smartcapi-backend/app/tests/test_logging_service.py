@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from conftest import APP_DIR, load_module_from_path, stub_module
+
+
+@pytest.fixture
+def logging_module(tmp_path, load_app_module):
+    """services/logging_service.py dengan semua file log di tmp_path."""
+    config = stub_module(
+        "config",
+        LOGS_DIR=tmp_path,
+        LOG_FILE=tmp_path / "system.log",
+        LOG_LEVEL="INFO",
+        INFERENCE_LOG=tmp_path / "inference.json",
+        REGISTRATION_LOG=tmp_path / "registration_log.csv",
+        RETRAIN_HISTORY_LOG=tmp_path / "retrain_history.csv",
+        PROGRESS_REPORT_LOG=tmp_path / "progress_report.csv",
+    )
+    return load_app_module("services/logging_service.py", {
+        "config": config,
+        "utils": stub_module("utils"),
+        "utils.json_utils": load_module_from_path(APP_DIR / "utils" / "json_utils.py", "utils.json_utils"),
+        "utils.log_files": load_module_from_path(APP_DIR / "utils" / "log_files.py", "utils.log_files"),
+    })
+
+
+@pytest.fixture
+def log_service(logging_module):
+    service = logging_module.LoggingService()
+    yield service
+    service.close()
+
+
+def test_inference_records_are_readable_and_counted(log_service):
+    log_service.log_inference(1, 12, "success")
+    log_service.log_inference(2, 0, "failed", error="audio rusak")
+    log_service.flush()
+
+    records = [log for log in log_service.iter_logs("inference") if "interview_id" in log]
+    assert [(r["interview_id"], r["status"], r["error"]) for r in records] == [
+        (1, "success", None),
+        (2, "failed", "audio rusak"),
+    ]
+    assert log_service.get_logs("inference", filter_by={"status": "failed"}) == [records[1]]
+    # Dua record ditambah pesan kategori INFERENCE-nya
+    assert log_service.get_log_statistics()["json_logs"]["inference"] == 4
+
+
+def test_csv_rows_follow_log_replaced_by_another_process(log_service, tmp_path):
+    log_file = tmp_path / "progress_report.csv"
+    log_service.log_progress("t1", "retrain", "running", 10.0, "mulai")
+    log_service.flush()
+
+    # Proses lain menulis ulang log (mis. compaction) lewat os.replace
+    replacement = tmp_path / "progress_report.csv.new"
+    replacement.write_text(log_file.read_text())
+    os.replace(replacement, log_file)
+
+    log_service.log_progress("t1", "retrain", "done", 100.0, "selesai")
+    log_service.flush()
+
+    rows = log_service.get_csv_logs("progress")
+    assert [(r["task_id"], r["status"]) for r in rows] == [("t1", "running"), ("t1", "done")]
+
+
+def test_category_json_keeps_entries_below_system_log_level(logging_module, log_service):
+    log_service.system_logger.setLevel("WARNING")
+    log_service.info("segmen diproses", logging_module.LogCategory.INFERENCE)
+    log_service.flush()
+
+    messages = [log.get("message") for log in log_service.iter_logs("inference")]
+    assert messages == ["segmen diproses"]
+    assert "segmen diproses" not in (log_service.logs_dir / "system.log").read_text()
+
+
+def test_io_uring_is_opt_in(logging_module, monkeypatch):
+    """Walaupun liburing terpasang, io_uring hanya dipakai jika LOG_USE_IO_URING diaktifkan."""
+    started = []
+    monkeypatch.setattr(logging_module, "Ring", object)
+    monkeypatch.setattr(logging_module, "_UringWriter", lambda entries: started.append(entries) or "ring")
+
+    service = logging_module.LoggingService()
+    assert service._setup_uring() is None
+
+    logging_module.config.LOG_USE_IO_URING = True
+    assert service._setup_uring() == "ring"
+    assert started == [256]
+    service.close()
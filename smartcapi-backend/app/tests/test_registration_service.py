@@ -0,0 +1,149 @@
+import csv
+import importlib.util
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import APP_DIR, load_module_from_path, stub_module
+
+pytest.importorskip("pandas")
+
+
+@pytest.fixture
+def registration(tmp_path, load_app_module):
+    """
+    Muat services/registration_service.py dengan config, database dan utilitas
+    audio diganti stub; semua file log diarahkan ke tmp_path.
+    """
+    config = stub_module(
+        "config",
+        REGISTRATION_LOG=tmp_path / "registration_log.csv",
+        REGISTRATION_DIR=tmp_path / "registrations",
+        ENUMERATOR_LIST_PATH=tmp_path / "enumerators.json",
+        TEMP_DIR=tmp_path,
+        AUDIO_DURATION=3.0,
+    )
+    stubs = {
+        "config": config,
+        "api": stub_module("api"),
+        "api.database": stub_module("api.database", User=object, VoiceRegistration=object),
+        "utils": stub_module("utils"),
+        "utils.audio_utils": stub_module("utils.audio_utils", preprocess_audio=None, split_audio_file=None),
+        "utils.feature_utils": stub_module("utils.feature_utils", extract_features_from_file=None),
+        "utils.json_utils": load_module_from_path(APP_DIR / "utils" / "json_utils.py", "utils.json_utils"),
+        "utils.log_files": load_module_from_path(APP_DIR / "utils" / "log_files.py", "utils.log_files"),
+    }
+    if importlib.util.find_spec("sqlalchemy") is None:
+        stubs["sqlalchemy"] = stub_module("sqlalchemy")
+        stubs["sqlalchemy.orm"] = stub_module("sqlalchemy.orm", Session=object)
+    return load_app_module("services/registration_service.py", stubs)
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_appender_writes_header_once(tmp_path, registration):
+    log = tmp_path / "log.csv"
+    appender = registration.get_csv_appender(log, ["a", "b"])
+    appender.append([1, 2])
+    appender.append_many([[3, 4], [5, 6]])
+
+    assert read_rows(log) == [["a", "b"], ["1", "2"], ["3", "4"], ["5", "6"]]
+
+
+def test_appender_follows_file_replaced_by_another_process(tmp_path, registration):
+    """Setelah file diganti (os.replace) di luar appender, baris baru harus masuk ke file baru."""
+    log = tmp_path / "log.csv"
+    appender = registration.get_csv_appender(log, ["a", "b"])
+    appender.append([1, 2])
+
+    replacement = tmp_path / "log.csv.new"
+    replacement.write_text("a,b\n1,2\n")
+    os.replace(replacement, log)
+    appender.append([3, 4])
+
+    assert read_rows(log) == [["a", "b"], ["1", "2"], ["3", "4"]]
+
+
+def test_appender_recreates_removed_file(tmp_path, registration):
+    log = tmp_path / "log.csv"
+    appender = registration.get_csv_appender(log, ["a", "b"])
+    appender.append([1, 2])
+
+    log.unlink()
+    appender.append([3, 4])
+
+    assert read_rows(log) == [["a", "b"], ["3", "4"]]
+
+
+def test_bulk_mark_appends_to_journal_without_rewriting_log(tmp_path, registration):
+    service = registration.VoiceRegistrationService()
+    service.log_registration(1, "ani", "enum_1_ani", 20)
+    service.log_registration(2, "budi", "enum_2_budi", 20)
+    log_inode = os.stat(registration.config.REGISTRATION_LOG).st_ino
+
+    service.mark_retrain_complete_bulk(["enum_1_ani", "enum_1_ani"])
+
+    assert os.stat(registration.config.REGISTRATION_LOG).st_ino == log_inode
+    journal = read_rows(service.status_journal_path)
+    assert [row[:2] for row in journal[1:]] == [["enum_1_ani", "retrained"]]
+    assert service.get_pending_speaker_ids() == ["enum_2_budi"]
+
+
+def test_bulk_mark_compacts_once_journal_exceeds_limit(tmp_path, registration):
+    registration.config.REGISTRATION_JOURNAL_MAX_BYTES = 0
+    service = registration.VoiceRegistrationService()
+    service.log_registration(1, "ani", "enum_1_ani", 20)
+    service.log_registration(2, "budi", "enum_2_budi", 20)
+
+    service.mark_retrain_complete_bulk(["enum_1_ani"])
+
+    assert not service.status_journal_path.exists()
+    statuses = {row[3]: row[5] for row in read_rows(registration.config.REGISTRATION_LOG)[1:]}
+    assert statuses == {"enum_1_ani": "retrained", "enum_2_budi": "pending_retrain"}
+    assert service.get_pending_speaker_ids() == ["enum_2_budi"]
+
+
+def test_compaction_keeps_status_rows_appended_meanwhile(tmp_path, registration, monkeypatch):
+    """Baris journal yang ditulis selama kompaksi berjalan harus masuk ke journal baru."""
+    service = registration.VoiceRegistrationService()
+    service.log_registration(1, "ani", "enum_1_ani", 20)
+    service.log_registration(2, "budi", "enum_2_budi", 20)
+    service.mark_retrain_complete("enum_1_ani")
+
+    writer = threading.Thread(target=service.mark_retrain_complete, args=("enum_2_budi",))
+    read_csv = registration.pd.read_csv
+
+    def slow_read_csv(*args, **kwargs):
+        # Journal lama sedang dilipat: penulis lain harus menunggu
+        writer.start()
+        time.sleep(0.2)
+        assert writer.is_alive()
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(registration.pd, "read_csv", slow_read_csv)
+    service.compact_status_journal()
+    writer.join(timeout=5)
+
+    journal = read_rows(service.status_journal_path)
+    assert journal[0] == registration.STATUS_JOURNAL_COLUMNS
+    assert [row[0] for row in journal[1:]] == ["enum_2_budi"]
+    assert service.get_pending_speaker_ids() == []
+
+
+def test_enumerator_snapshot_replaces_journal(tmp_path, registration):
+    service = registration.VoiceRegistrationService()
+    service.enumerator_list["enum_1_ani"] = {"username": "ani"}
+    service._journal_enumerator_changes([
+        {"op": "add", "id": "enum_1_ani", "data": {"username": "ani"}}
+    ])
+    assert service.enumerator_journal_path.exists()
+
+    service.save_enumerator_list()
+
+    assert not service.enumerator_journal_path.exists()
+    assert registration.VoiceRegistrationService().enumerator_list == {"enum_1_ani": {"username": "ani"}}
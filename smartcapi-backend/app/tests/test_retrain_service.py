@@ -0,0 +1,192 @@
+import importlib.util
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import stub_module
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+
+class FakeTrainer:
+    """Trainer pengganti yang mencatat urutan pemanggilan."""
+
+    def __init__(self, calls, fail_evaluate=False):
+        self.calls = calls
+        self.fail_evaluate = fail_evaluate
+        self.metadata = {}
+        self.label_encoder = None
+
+    def preprocess_data(self, X, y, fit_encoder=True, fit_scaler=True):
+        self.label_encoder = stub_module("encoder", classes_=np.unique(y))
+        return X, np.searchsorted(self.label_encoder.classes_, y)
+
+    def train(self, X, y, **kwargs):
+        self.calls.append("train")
+
+    def evaluate(self, X, y):
+        self.calls.append("evaluate")
+        if self.fail_evaluate:
+            raise RuntimeError("evaluasi gagal")
+        return {"accuracy": 1.0}
+
+    def save_model(self):
+        self.calls.append("save_model")
+
+
+class FakeRegistrationService:
+    def __init__(self, db=None):
+        self.marked = []
+
+    def get_pending_speaker_ids(self):
+        return ["enum_1_ani"]
+
+    def mark_retrain_complete_bulk(self, speaker_ids):
+        self.marked.extend(speaker_ids)
+
+
+class FakeAppender:
+    def append(self, row):
+        pass
+
+
+@pytest.fixture
+def retrain(tmp_path, load_app_module):
+    """Muat services/retrain_service.py dengan semua dependensi berat diganti stub."""
+    config = stub_module(
+        "config",
+        RETRAIN_HISTORY_LOG=tmp_path / "retrain_history.csv",
+        FEATURES_ENUMERATOR_CSV=tmp_path / "features_enumerator.csv",
+        ENUMERATOR_LIST_PATH=tmp_path / "enumerators.json",
+    )
+    stubs = {
+        "config": config,
+        "api": stub_module("api"),
+        "api.database": stub_module("api.database", ModelMetrics=object),
+        "feature_extraction": stub_module("feature_extraction", FeatureExtractor=lambda: None),
+        "training": stub_module("training"),
+        "training.train": stub_module("training.train", SpeakerIdentificationTrainer=lambda: None),
+        "services": stub_module("services"),
+        "services.registration_service": stub_module(
+            "services.registration_service",
+            VoiceRegistrationService=FakeRegistrationService,
+            get_csv_appender=lambda path, columns: FakeAppender(),
+            write_enumerator_snapshot=lambda path, data: None,
+        ),
+        "utils": stub_module("utils"),
+        "utils.json_utils": stub_module("utils.json_utils", json_dumps=None),
+    }
+    if importlib.util.find_spec("sqlalchemy") is None:
+        stubs["sqlalchemy"] = stub_module("sqlalchemy")
+        stubs["sqlalchemy.orm"] = stub_module("sqlalchemy.orm", Session=object)
+    return load_app_module("services/retrain_service.py", stubs)
+
+
+def make_service(retrain, calls, fail_evaluate=False):
+    service = retrain.RetrainService()
+    service.trainer = FakeTrainer(calls, fail_evaluate)
+    combined = pd.DataFrame({
+        "label": ["ani", "ani", "budi", "budi"],
+        "mfcc_1": [0.1, 0.2, 0.3, 0.4],
+    })
+    service.extract_new_features = lambda: {"success": True}
+    service.combine_all_features = lambda: combined
+    service._update_enumerator_list = lambda df: calls.append("update_enumerator_list")
+    return service
+
+
+def test_retrain_persists_only_after_evaluation(retrain):
+    calls = []
+    result = make_service(retrain, calls).retrain_model(force=True)
+
+    assert result["success"] is True
+    assert calls[:3] == ["train", "evaluate", "evaluate"]
+    assert sorted(calls[3:]) == ["save_model", "update_enumerator_list"]
+
+
+def test_failed_evaluation_keeps_existing_model(retrain):
+    """Jika evaluasi gagal, model produksi dan daftar enumerator tidak boleh ditimpa."""
+    calls = []
+    service = make_service(retrain, calls, fail_evaluate=True)
+    result = service.retrain_model(force=True)
+
+    assert result["status"] == "failed"
+    assert "save_model" not in calls
+    assert "update_enumerator_list" not in calls
+    assert service.registration_service.marked == []
+
+
+class FakeExtractor:
+    """FeatureExtractor pengganti: mencatat isi direktori yang diekstrak."""
+
+    def __init__(self):
+        self.seen = []
+
+    def extract_from_subdirectories(self, directory, preprocess=True):
+        names = sorted(p.name for p in directory.iterdir())
+        self.seen.append(names)
+        return pd.DataFrame({"label": names, "mfcc_1": [0.0] * len(names)})
+
+
+def make_speaker_dirs(tmp_path, names):
+    dirs = []
+    for name in names:
+        speaker_dir = tmp_path / "registrations" / name
+        speaker_dir.mkdir(parents=True)
+        (speaker_dir / "sample_0.wav").write_bytes(b"RIFF")
+        dirs.append(speaker_dir)
+    return dirs
+
+
+def test_daemon_process_extracts_serially(tmp_path, retrain, monkeypatch):
+    """Worker Celery (proses daemon) tidak boleh membuat ProcessPoolExecutor."""
+    retrain.config.RETRAIN_WORKERS = 4
+    monkeypatch.setattr(retrain.multiprocessing, "current_process", lambda: SimpleNamespace(daemon=True))
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("ProcessPoolExecutor dipakai di proses daemon")
+
+    monkeypatch.setattr(retrain, "ProcessPoolExecutor", no_pool)
+    service = retrain.RetrainService()
+    service.feature_extractor = FakeExtractor()
+    speaker_dirs = make_speaker_dirs(tmp_path, ["enum_1_ani", "enum_2_budi"])
+
+    df = service._extract_registration_features(speaker_dirs)
+
+    assert service.feature_extractor.seen == [["enum_1_ani", "enum_2_budi"]]
+    assert sorted(df["label"]) == ["enum_1_ani", "enum_2_budi"]
+    assert all((d / "sample_0.wav").exists() for d in speaker_dirs)
+
+
+def test_worker_pool_uses_spawn_and_removes_links(tmp_path, retrain, monkeypatch):
+    retrain.config.RETRAIN_WORKERS = 2
+    used = {}
+    staged = []
+
+    class FakePool:
+        def __init__(self, max_workers, mp_context):
+            used["context"] = mp_context.get_start_method()
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def map(self, fn, partitions):
+            for partition in partitions:
+                staged.extend(retrain.Path(partition).iterdir())
+            raise RuntimeError("worker gagal")
+
+    monkeypatch.setattr(retrain, "ProcessPoolExecutor", FakePool)
+    service = retrain.RetrainService()
+    speaker_dirs = make_speaker_dirs(tmp_path, ["enum_1_ani", "enum_2_budi"])
+
+    with pytest.raises(RuntimeError):
+        service._extract_registration_features(speaker_dirs)
+
+    assert used["context"] == "spawn"
+    assert len(staged) == 2
+    assert not any(link.is_symlink() or link.exists() for link in staged)
+    assert all((d / "sample_0.wav").exists() for d in speaker_dirs)
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import stub_module
+
+np = pytest.importorskip("numpy")
+
+SR = 16000
+
+
+class FakePipeline:
+    """BatchedInferencePipeline pengganti: mencatat clip dan mengembalikan kata per clip."""
+
+    def __init__(self, model=None):
+        self.calls = []
+
+    def transcribe(self, audio, clip_timestamps, **kwargs):
+        self.calls.append((audio, clip_timestamps))
+        segments = []
+        for i, clip in enumerate(clip_timestamps):
+            # Pipeline asli memotong sinyal dengan offset sampel ini
+            assert isinstance(clip["start"], int) and isinstance(clip["end"], int)
+            assert len(audio[clip["start"]:clip["end"]]) == clip["end"] - clip["start"]
+            start, end = clip["start"] / SR, clip["end"] / SR
+            word = SimpleNamespace(word=f" w{i}", start=start + 0.1, end=min(start + 0.5, end))
+            segments.append(SimpleNamespace(words=[word]))
+        return iter(segments), SimpleNamespace(language="id")
+
+
+@pytest.fixture
+def whisper(load_app_module):
+    stubs = {
+        "config": stub_module("config"),
+        "ctranslate2": stub_module("ctranslate2", get_cuda_device_count=lambda: 0),
+        "faster_whisper": stub_module(
+            "faster_whisper",
+            WhisperModel=lambda *args, **kwargs: None,
+            BatchedInferencePipeline=FakePipeline,
+        ),
+    }
+    return load_app_module("services/whisper_service.py", stubs)
+
+
+def test_transcribe_batch_uses_sample_offsets(whisper):
+    transcriber = whisper.WhisperTranscriber(device="cpu")
+    audios = [
+        np.zeros(SR, dtype=np.float32),        # 1 s
+        np.zeros(31 * SR, dtype=np.float32),   # 31 s -> dua window
+        np.zeros(2 * SR, dtype=np.float32),    # 2 s
+    ]
+
+    results = transcriber.transcribe_batch(audios, SR)
+
+    joined, clips = transcriber.batched.calls[0]
+    assert len(joined) == 34 * SR
+    assert clips == [
+        {"start": 0, "end": SR},
+        {"start": SR, "end": 31 * SR},
+        {"start": 31 * SR, "end": 32 * SR},
+        {"start": 32 * SR, "end": 34 * SR},
+    ]
+    assert [r["text"] for r in results] == ["w0", "w1 w2", "w3"]
+    assert all(r["language"] == "id" for r in results)
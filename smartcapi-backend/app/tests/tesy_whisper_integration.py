@@ -1,7 +1,6 @@
 import pytest
 import wave
-import struct
-import math
+import numpy as np
 
 def write_short_wav(path, sr=16000, duration_s=0.5, freq=440.0):
     import wave
@@ -10,10 +9,9 @@ def write_short_wav(path, sr=16000, duration_s=0.5, freq=440.0):
         wf.setnchannels(1)
         wf.setsampwidth(2)
         wf.setframerate(sr)
-        for i in range(n):
-            t = i / sr
-            val = 0.5 * math.sin(2 * math.pi * freq * t)
-            wf.writeframes(struct.pack("<h", int(val * 32767)))
+        t = np.arange(n) / sr
+        samples = (0.5 * np.sin(2 * np.pi * freq * t) * 32767).astype("<i2")
+        wf.writeframes(samples.tobytes())
 
 def test_whisper_transcribe_smoke(tmp_path, load_module, monkeypatch):
     """
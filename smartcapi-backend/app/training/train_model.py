@@ -1,37 +1,105 @@
 
+import hashlib
 import os
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score
 import joblib
 
+def save_model_artifact(artifact, model_output_path: str):
+    """
+    Save a model artifact. A .skops path is written with skops.io, which
+    stores the tree arrays as plain numpy blocks and loads without pickle;
+    any other path is written with joblib.
+    """
+    if model_output_path.endswith('.skops'):
+        import skops.io as sio
+        sio.dump(artifact, model_output_path)
+    else:
+        joblib.dump(artifact, model_output_path, compress=3)
+
+def model_fingerprint(model_path: str) -> str:
+    """SHA-256 of a saved model artifact, stamped next to its compiled library."""
+    with open(model_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def export_compiled_model(model, model_output_path: str):
+    """
+    Compile the fitted trees to a native shared library next to the saved
+    artifact (same name, .so suffix) when treelite and tl2cgen are installed.
+
+    A library left by an earlier export is removed first, so a skipped or
+    failed export never leaves one built from a previous model. On success
+    the artifact's fingerprint is written to <library>.source; the inference
+    code only loads the library when that stamp matches the artifact.
+
+    Returns:
+        Path to the library, or None when the compilers are not available.
+    """
+    libpath = os.path.splitext(model_output_path)[0] + '.so'
+    stamp_path = libpath + '.source'
+    for path in (stamp_path, libpath):
+        if os.path.exists(path):
+            os.remove(path)
+
+    try:
+        import treelite
+        import tl2cgen
+    except ImportError:
+        return None
+
+    tl2cgen.export_lib(
+        treelite.sklearn.import_model(model),
+        toolchain='gcc',
+        libpath=libpath,
+        params={'parallel_comp': os.cpu_count() or 1}
+    )
+    with open(stamp_path, 'w') as f:
+        f.write(model_fingerprint(model_output_path))
+    return libpath
+
 def train_speaker_model(training_data_path: str, model_output_path: str):
     """
-    Trains a speaker recognition model using a RandomForestClassifier.
+    Trains a speaker recognition model using a HistGradientBoostingClassifier.
 
     Args:
         training_data_path (str): The path to the CSV file containing the training data.
                                   The CSV should have a 'Label' column for speaker IDs
                                   and the rest of the columns as features.
-        model_output_path (str): The path to save the trained model (.pkl file).
+        model_output_path (str): The path to save the trained model (.skops or .pkl file).
+                                 Saved as {'model': ..., 'classes_': ...}; the model
+                                 predicts indices into classes_.
     """
     if not os.path.exists(training_data_path):
         print(f"Error: Training data not found at {training_data_path}")
         return
 
-    # Load the training data
-    data = pd.read_csv(training_data_path)
+    # Load the training data with the multithreaded pyarrow parser when available
+    try:
+        data = pd.read_csv(training_data_path, engine='pyarrow', dtype_backend='pyarrow')
+    except ImportError:
+        data = pd.read_csv(training_data_path)
 
-    # Separate features (X) and labels (y)
-    X = data.drop('Label', axis=1)
-    y = data['Label']
+    # Separate features (X) and labels (y), with speaker IDs encoded as int32
+    X = data.drop('Label', axis=1).to_numpy(dtype=np.float32)
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(data['Label'].to_numpy()).astype(np.int32)
 
     # Split data for training and validation
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
 
-    # Initialize and train the RandomForestClassifier
-    model = RandomForestClassifier(n_estimators=100, random_state=42, warm_start=False)
+    # Initialize and train the HistGradientBoostingClassifier (features binned to
+    # uint8, histograms built in parallel with OpenMP)
+    model = HistGradientBoostingClassifier(
+        max_iter=200,
+        learning_rate=0.1,
+        max_bins=255,
+        early_stopping='auto',
+        random_state=42
+    )
     model.fit(X_train, y_train)
 
     # Evaluate the model
@@ -41,9 +109,13 @@ def train_speaker_model(training_data_path: str, model_output_path: str):
 
     # Save the trained model
     os.makedirs(os.path.dirname(model_output_path), exist_ok=True)
-    joblib.dump(model, model_output_path)
+    save_model_artifact({'model': model, 'classes_': label_encoder.classes_}, model_output_path)
     print(f"Model successfully retrained and saved to {model_output_path}")
 
+    libpath = export_compiled_model(model, model_output_path)
+    if libpath:
+        print(f"Compiled model library saved to {libpath}")
+
 if __name__ == '__main__':
     # Example usage of the training script
     # This part will not be executed when imported in another script
@@ -56,16 +128,13 @@ if __name__ == '__main__':
     # Create a dummy training data file for demonstration
     if not os.path.exists(training_data_csv):
         print("Creating dummy training data...")
-        dummy_data = {
-            'Label': ['user1', 'user1', 'user2', 'user2'],
-            'MFCC_1': [0.1, 0.12, 0.8, 0.82],
-            'MFCC_2': [0.2, 0.22, 0.7, 0.72],
-            # Add more features as in your feature_extraction.py
-        }
-        for i in range(3, 34):
-            dummy_data[f'MFCC_{i}'] = [0.0] * 4
-            
-        df = pd.DataFrame(dummy_data)
+        # Add more features as in your feature_extraction.py
+        dummy_features = np.zeros((4, 33), dtype=np.float32)
+        dummy_features[:, 0] = [0.1, 0.12, 0.8, 0.82]
+        dummy_features[:, 1] = [0.2, 0.22, 0.7, 0.72]
+
+        df = pd.DataFrame(dummy_features, columns=[f'MFCC_{i}' for i in range(1, 34)])
+        df.insert(0, 'Label', ['user1', 'user1', 'user2', 'user2'])
         os.makedirs(os.path.dirname(training_data_csv), exist_ok=True)
         df.to_csv(training_data_csv, index=False)
 
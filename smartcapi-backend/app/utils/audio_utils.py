@@ -4,11 +4,13 @@ Menangani preprocessing audio, noise reduction, segmentasi, dll
 """
 
 import os
+import math
 import numpy as np
 import librosa
 import soundfile as sf
+import soxr
 from scipy import signal
-from typing import Tuple, List, Optional, Dict
+from typing import Tuple, List, Optional, Dict, Iterator
 import noisereduce as nr
 from pydub import AudioSegment
 from pathlib import Path
@@ -33,7 +35,8 @@ class AudioUtils:
         duration: Optional[float] = None
     ) -> Tuple[np.ndarray, int]:
         """
-        Load audio file dengan librosa
+        Load audio file lewat soundfile + soxr; format yang tidak didukung
+        libsndfile (mis. mp3 pada versi lama) jatuh ke librosa
         
         Args:
             file_path: Path ke file audio
@@ -46,13 +49,18 @@ class AudioUtils:
             Tuple (audio_data, sample_rate)
         """
         try:
-            audio, sample_rate = librosa.load(
-                file_path,
-                sr=sr,
-                mono=mono,
-                offset=offset,
-                duration=duration
-            )
+            try:
+                audio, sample_rate = AudioUtils._load_with_soundfile(
+                    file_path, sr, mono, offset, duration
+                )
+            except RuntimeError:
+                audio, sample_rate = librosa.load(
+                    file_path,
+                    sr=sr,
+                    mono=mono,
+                    offset=offset,
+                    duration=duration
+                )
             
             logger.info(f"Audio loaded: {file_path} | SR: {sample_rate} | Shape: {audio.shape}")
             return audio, sample_rate
@@ -62,6 +70,39 @@ class AudioUtils:
             raise
     
     
+    @staticmethod
+    def _load_with_soundfile(
+        file_path: str,
+        sr: Optional[int],
+        mono: bool,
+        offset: float,
+        duration: Optional[float]
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Baca float32 langsung dengan satu kali buka file, lalu downmix dan
+        resample (soxr HQ, sama dengan default librosa). Bentuk output sama
+        dengan librosa.load: (n,) untuk mono, (channels, n) untuk multichannel.
+        """
+        with sf.SoundFile(file_path) as f:
+            file_sr = f.samplerate
+            if offset:
+                f.seek(int(offset * file_sr))
+            frames = int(duration * file_sr) if duration is not None else -1
+            audio = f.read(frames, dtype='float32', always_2d=True)
+        
+        if mono or audio.shape[1] == 1:
+            audio = audio.mean(axis=1, dtype=np.float32) if audio.shape[1] > 1 else audio[:, 0]
+        
+        if sr and sr != file_sr:
+            audio = soxr.resample(audio, file_sr, sr, quality='HQ')
+        else:
+            sr = file_sr
+        
+        if audio.ndim == 2:
+            audio = audio.T
+        return np.ascontiguousarray(audio, dtype=np.float32), sr
+    
+    
     @staticmethod
     def save_audio(
         audio: np.ndarray,
@@ -92,20 +133,27 @@ class AudioUtils:
     
     
     @staticmethod
-    def normalize_audio(audio: np.ndarray, target_db: float = -20.0) -> np.ndarray:
+    def normalize_audio(
+        audio: np.ndarray,
+        target_db: float = -20.0,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """
         Normalize audio ke target dB
         
         Args:
             audio: Audio data
             target_db: Target loudness dalam dB
+            out: Buffer output milik caller (boleh audio itu sendiri);
+                 None untuk mengalokasikan array baru
             
         Returns:
             Normalized audio
         """
         try:
-            # Hitung RMS
-            rms = np.sqrt(np.mean(audio**2))
+            # Hitung RMS: jumlah kuadrat dengan satu dot product, tanpa array audio**2
+            flat = audio.ravel()
+            rms = math.sqrt(float(np.dot(flat, flat)) / flat.size) if flat.size else 0.0
             
             # Avoid division by zero
             if rms == 0:
@@ -114,11 +162,9 @@ class AudioUtils:
             # Konversi target dB ke linear scale
             target_linear = 10 ** (target_db / 20.0)
             
-            # Normalize
-            normalized = audio * (target_linear / rms)
-            
-            # Clip untuk menghindari clipping
-            normalized = np.clip(normalized, -1.0, 1.0)
+            # Normalize, lalu clip di buffer yang sama untuk menghindari clipping
+            normalized = np.multiply(audio, target_linear / rms, out=out)
+            np.clip(normalized, -1.0, 1.0, out=normalized)
             
             return normalized
             
@@ -206,10 +252,13 @@ class AudioUtils:
         sr: int = DEFAULT_SR,
         segment_duration: float = 3.0,
         overlap: float = 0.5
-    ) -> List[np.ndarray]:
+    ) -> np.ndarray:
         """
         Split audio menjadi segmen-segmen
         
+        Segmen dibentuk sebagai view fixed-stride (tanpa copy) di atas buffer
+        audio; copy hanya terjadi bila segmen terakhir perlu ditambahkan.
+        
         Args:
             audio: Audio data
             sr: Sample rate
@@ -217,32 +266,155 @@ class AudioUtils:
             overlap: Overlap antar segmen (detik)
             
         Returns:
-            List of audio segments
+            Array 2-D (n_segments, segment_samples)
         """
         try:
             segment_samples = int(segment_duration * sr)
             overlap_samples = int(overlap * sr)
             hop_samples = segment_samples - overlap_samples
             
-            segments = []
+            if len(audio) < segment_samples:
+                segments = np.empty((0, segment_samples), dtype=audio.dtype)
+                logger.info("Audio split into 0 segments")
+                return segments
             
-            for start in range(0, len(audio) - segment_samples + 1, hop_samples):
-                end = start + segment_samples
-                segment = audio[start:end]
-                segments.append(segment)
+            windows = np.lib.stride_tricks.sliding_window_view(audio, segment_samples)
+            segments = windows[::hop_samples]
             
             # Handle last segment jika kurang dari segment_duration
             if len(audio) % hop_samples != 0:
-                last_segment = audio[-segment_samples:]
-                if len(last_segment) == segment_samples:
-                    segments.append(last_segment)
+                segments = np.vstack([segments, audio[-segment_samples:]])
             
             logger.info(f"Audio split into {len(segments)} segments")
             return segments
             
         except Exception as e:
             logger.error(f"Error splitting audio: {str(e)}")
-            return [audio]
+            return audio[np.newaxis, :]
+    
+    
+    @staticmethod
+    def load_segment_matrix(
+        file_path: str,
+        sr: int = DEFAULT_SR,
+        segment_duration: float = 3.0,
+        blocksize: int = 65536
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Load audio langsung menjadi matriks segmen fixed-stride
+        
+        File dibaca per blok dengan soundfile, di-downmix ke mono dan
+        di-resample sekali (soxr) ke buffer float32 yang sudah dialokasikan,
+        sehingga audio penuh tidak pernah disalin ulang. Segmen terakhir
+        di-pad dengan nol.
+        
+        Args:
+            file_path: Path ke file audio
+            sr: Sample rate target
+            segment_duration: Durasi tiap segmen (detik)
+            blocksize: Jumlah frame per blok baca
+            
+        Returns:
+            Tuple (segments (n_segments, segment_samples), sample_rate)
+        """
+        try:
+            chunks = list(AudioUtils.iter_segment_matrices(
+                file_path, sr, segment_duration, blocksize=blocksize
+            ))
+            if chunks:
+                segments = chunks[0]
+            else:
+                segments = np.zeros((0, int(segment_duration * sr)), dtype=np.float32)
+            
+            logger.info(f"Audio loaded: {file_path} | SR: {sr} | Segments: {len(segments)}")
+            return segments, sr
+            
+        except Exception as e:
+            logger.error(f"Error loading audio {file_path}: {str(e)}")
+            raise
+    
+    
+    @staticmethod
+    def iter_segment_matrices(
+        file_path: str,
+        sr: int = DEFAULT_SR,
+        segment_duration: float = 3.0,
+        chunk_duration: Optional[float] = None,
+        blocksize: int = 65536
+    ) -> Iterator[np.ndarray]:
+        """
+        Stream audio sebagai potongan matriks segmen fixed-stride
+        
+        Setiap potongan berisi maksimal chunk_duration detik audio dalam
+        bentuk (n_segments, segment_samples), sehingga memori untuk rekaman
+        panjang tetap terbatas. Segmen ke-i pada potongan ke-k adalah segmen
+        global k * (chunk_duration // segment_duration) + i.
+        
+        Args:
+            file_path: Path ke file audio
+            sr: Sample rate target
+            segment_duration: Durasi tiap segmen (detik)
+            chunk_duration: Durasi tiap potongan (detik), None = seluruh file
+            blocksize: Jumlah frame per blok baca
+            
+        Yields:
+            Matriks segmen float32 per potongan
+        """
+        info = sf.info(file_path)
+        segment_samples = int(segment_duration * sr)
+        out_len = int(math.ceil(info.frames * sr / info.samplerate))
+        n_segments = -(-out_len // segment_samples)
+        
+        chunk_segments = n_segments
+        if chunk_duration is not None:
+            chunk_segments = max(1, int(chunk_duration // segment_duration))
+        
+        # Samples still to be allocated, padded to whole segments
+        remaining = n_segments * segment_samples
+        buffer = None
+        pos = 0
+        
+        for samples in AudioUtils._iter_mono_blocks(file_path, info.samplerate, sr, blocksize):
+            while len(samples) and remaining:
+                if buffer is None:
+                    buffer = np.zeros(min(chunk_segments * segment_samples, remaining), dtype=np.float32)
+                    pos = 0
+                
+                n = min(len(samples), len(buffer) - pos)
+                buffer[pos:pos + n] = samples[:n]
+                pos += n
+                samples = samples[n:]
+                
+                if pos == len(buffer):
+                    remaining -= len(buffer)
+                    yield buffer.reshape(-1, segment_samples)
+                    buffer = None
+        
+        if buffer is not None:
+            yield buffer.reshape(-1, segment_samples)
+    
+    
+    @staticmethod
+    def _iter_mono_blocks(
+        file_path: str,
+        orig_sr: int,
+        target_sr: int,
+        blocksize: int
+    ) -> Iterator[np.ndarray]:
+        """Baca file per blok, downmix ke mono dan resample secara streaming"""
+        resampler = None
+        if orig_sr != target_sr:
+            resampler = soxr.ResampleStream(orig_sr, target_sr, 1, dtype='float32')
+        
+        blocks = sf.blocks(file_path, blocksize=blocksize, dtype='float32', always_2d=True)
+        for block in blocks:
+            samples = block.mean(axis=1, dtype=np.float32)
+            if resampler is not None:
+                samples = resampler.resample_chunk(samples)
+            yield samples
+        
+        if resampler is not None:
+            yield resampler.resample_chunk(np.empty(0, dtype=np.float32), last=True)
     
     
     @staticmethod
@@ -287,6 +459,26 @@ class AudioUtils:
             return np.ones(len(audio) // hop_length, dtype=bool)
     
     
+    @staticmethod
+    def segment_activity(
+        segments: np.ndarray,
+        energy_threshold: float = 0.01
+    ) -> np.ndarray:
+        """
+        VAD berbasis energi per baris matriks segmen
+        
+        Args:
+            segments: Matriks segmen (n_segments, segment_samples)
+            energy_threshold: Threshold RMS untuk voice
+            
+        Returns:
+            Boolean array per segmen (True = voice, False = silence)
+        """
+        # Sum of squares per row without materialising segments ** 2
+        energy = np.einsum('ij,ij->i', segments, segments) / segments.shape[1]
+        return np.sqrt(energy) > energy_threshold
+    
+    
     @staticmethod
     def resample_audio(
         audio: np.ndarray,
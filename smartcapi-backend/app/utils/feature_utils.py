@@ -3,6 +3,8 @@ Feature Extraction Utilities untuk SmartCAPI
 Ekstraksi MFCC dan fitur audio lainnya untuk speaker identification
 """
 
+import os
+import functools
 import numpy as np
 import librosa
 from typing import Dict, List, Tuple, Optional
@@ -10,6 +12,62 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# MFCC backend: 'librosa' atau 'torchaudio' (batched, GPU bila tersedia)
+MFCC_BACKEND = os.getenv("FEATURE_BACKEND", "librosa")
+
+
+@functools.lru_cache(maxsize=8)
+def _torchaudio_mfcc_transform(sr: int, n_mfcc: int, n_fft: int, hop_length: int, n_mels: int):
+    """
+    torchaudio MFCC transform configured like librosa.feature.mfcc (Slaney mel
+    filterbank, zero-padded centered frames, power dB with top_db=80, ortho DCT),
+    built once per parameter set on the best available device.
+    """
+    import torch
+    import torchaudio
+    
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    transform = torchaudio.transforms.MFCC(
+        sample_rate=sr,
+        n_mfcc=n_mfcc,
+        norm="ortho",
+        melkwargs={
+            "n_fft": n_fft,
+            "hop_length": hop_length,
+            "n_mels": n_mels,
+            "mel_scale": "slaney",
+            "norm": "slaney",
+            "pad_mode": "constant",
+        },
+    ).to(device)
+    return transform, device
+
+
+def _reduce_mfcc_stats(mfcc: np.ndarray) -> np.ndarray:
+    """
+    Mean, std, min, max dan median tiap koefisien MFCC (axis waktu), ditulis
+    langsung ke satu vektor output. Min, max dan median diambil dari satu
+    np.partition, bukan tiga reduksi terpisah.
+    """
+    n_mfcc, n_frames = mfcc.shape
+    features = np.empty(5 * n_mfcc, dtype=np.result_type(mfcc.dtype, np.float32))
+    
+    np.mean(mfcc, axis=1, out=features[:n_mfcc])
+    np.std(mfcc, axis=1, out=features[n_mfcc:2 * n_mfcc])
+    
+    half = n_frames // 2
+    part = np.partition(mfcc, sorted({0, max(half - 1, 0), half, n_frames - 1}), axis=1)
+    features[2 * n_mfcc:3 * n_mfcc] = part[:, 0]
+    features[3 * n_mfcc:4 * n_mfcc] = part[:, -1]
+    if n_frames % 2:
+        features[4 * n_mfcc:] = part[:, half]
+    else:
+        median = features[4 * n_mfcc:]
+        np.add(part[:, half - 1], part[:, half], out=median)
+        median *= 0.5
+    
+    return features
+
 
 class FeatureUtils:
     """Utility class untuk ekstraksi fitur audio"""
@@ -44,6 +102,11 @@ class FeatureUtils:
         Returns:
             MFCC features (n_mfcc, time_frames)
         """
+        if MFCC_BACKEND == "torchaudio":
+            return FeatureUtils.extract_mfcc_batch(
+                [audio], sr, n_mfcc, n_fft, hop_length, n_mels
+            )[0]
+        
         try:
             mfcc = librosa.feature.mfcc(
                 y=audio,
@@ -61,6 +124,57 @@ class FeatureUtils:
             raise
     
     
+    @staticmethod
+    def extract_mfcc_batch(
+        audios: List[np.ndarray],
+        sr: int = 16000,
+        n_mfcc: int = DEFAULT_N_MFCC,
+        n_fft: int = DEFAULT_N_FFT,
+        hop_length: int = DEFAULT_HOP_LENGTH,
+        n_mels: int = DEFAULT_N_MELS
+    ) -> np.ndarray:
+        """
+        Ekstraksi MFCC untuk banyak klip sekaligus
+        
+        Dengan backend torchaudio semua klip diproses sebagai satu tensor
+        (cuFFT bila ada GPU), dengan hasil per klip sama seperti extract_mfcc;
+        dengan librosa tiap klip diproses terpisah.
+        
+        Args:
+            audios: List audio dengan panjang sama
+            sr: Sample rate
+            n_mfcc: Jumlah MFCC coefficients
+            n_fft: FFT window size
+            hop_length: Hop length
+            n_mels: Number of mel bands
+            
+        Returns:
+            MFCC features (n_clips, n_mfcc, time_frames)
+        """
+        try:
+            batch = np.stack(audios).astype(np.float32, copy=False)
+            
+            if MFCC_BACKEND != "torchaudio":
+                return np.stack([
+                    librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=n_mfcc, n_fft=n_fft,
+                                         hop_length=hop_length, n_mels=n_mels)
+                    for audio in batch
+                ])
+            
+            import torch
+            
+            transform, device = _torchaudio_mfcc_transform(sr, n_mfcc, n_fft, hop_length, n_mels)
+            with torch.inference_mode():
+                # (n_clips, 1, samples): amplitude_to_DB menerapkan top_db per
+                # klip hanya bila tiap klip punya dimensi channel sendiri
+                mfcc = transform(torch.from_numpy(batch)[:, None, :].to(device)).squeeze(1)
+            return mfcc.cpu().numpy()
+            
+        except Exception as e:
+            logger.error(f"Error extracting MFCC batch: {str(e)}")
+            raise
+    
+    
     @staticmethod
     def extract_mfcc_stats(
         audio: np.ndarray,
@@ -84,22 +198,7 @@ class FeatureUtils:
             mfcc = FeatureUtils.extract_mfcc(audio, sr, n_mfcc)
             
             # Compute statistics across time axis
-            mfcc_mean = np.mean(mfcc, axis=1)
-            mfcc_std = np.std(mfcc, axis=1)
-            mfcc_min = np.min(mfcc, axis=1)
-            mfcc_max = np.max(mfcc, axis=1)
-            mfcc_median = np.median(mfcc, axis=1)
-            
-            # Concatenate all statistics
-            features = np.concatenate([
-                mfcc_mean,
-                mfcc_std,
-                mfcc_min,
-                mfcc_max,
-                mfcc_median
-            ])
-            
-            return features
+            return _reduce_mfcc_stats(mfcc)
             
         except Exception as e:
             logger.error(f"Error extracting MFCC stats: {str(e)}")
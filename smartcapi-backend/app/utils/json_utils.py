@@ -0,0 +1,35 @@
+"""
+Utilitas JSON untuk SmartCAPI
+Encoder/decoder bersama: orjson bila terpasang (C, bekerja dengan bytes),
+json bawaan bila tidak
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+    
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def json_dumps(obj: Any, indent: bool = False) -> bytes:
+        """Encode obj as UTF-8 JSON, optionally indented by two spaces."""
+        return orjson.dumps(obj, option=_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+    
+    def json_line(obj: Any) -> bytes:
+        """Encode obj as one JSON Lines record."""
+        return orjson.dumps(obj, option=_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+    
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj: Any, indent: bool = False) -> bytes:
+        """Encode obj as UTF-8 JSON, optionally indented by two spaces."""
+        if indent:
+            return json.dumps(obj, indent=2).encode('utf-8')
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    
+    def json_line(obj: Any) -> bytes:
+        """Encode obj as one JSON Lines record."""
+        return (json.dumps(obj, separators=(',', ':')) + '\n').encode('utf-8')
+    
+    json_loads = json.loads
@@ -0,0 +1,167 @@
+"""
+Utilitas file log bersama untuk SmartCAPI
+Lock antar-proses dan appender CSV untuk log yang ditulis oleh beberapa
+service dan proses (API dan Celery worker) sekaligus
+"""
+
+import os
+import csv
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Exclusive lock on a file descriptor, shared across processes (API and Celery worker)
+try:
+    import fcntl
+    
+    def _lock_fd(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    
+    def _unlock_fd(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+except ImportError:
+    import msvcrt
+    
+    def _lock_fd(fd: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue  # LK_LOCK gives up after ~10 s; keep waiting
+    
+    def _unlock_fd(fd: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def interprocess_lock(path: Path):
+    """
+    Hold an exclusive lock for path across threads and processes. The lock
+    lives on a sidecar <name>.lock file, which is never replaced, so it stays
+    valid while path itself is swapped out with os.replace.
+    """
+    lock_path = path.with_name(path.name + '.lock')
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        _lock_fd(fd)
+        try:
+            yield
+        finally:
+            _unlock_fd(fd)
+    finally:
+        os.close(fd)
+
+
+class CsvAppender:
+    """
+    CSV log kept open in append mode. The header row is written when the file
+    is new; every row is flushed so readers of the file see it immediately.
+    
+    Writes happen under an inter-process lock, and the open handle is reopened
+    whenever the path no longer points at its inode, so rows are never
+    appended to a file another process has replaced or removed. On Windows
+    an open file cannot be replaced, so there the handle is closed after
+    every write.
+    """
+    
+    def __init__(self, path: Path, header: List[str]):
+        self.path = Path(path)
+        self.header = header
+        self._lock = threading.Lock()
+        self._file = None
+        self._writer = None
+    
+    @contextmanager
+    def locked(self):
+        """Hold the log's lock; appends from every thread and process wait."""
+        with self._lock, interprocess_lock(self.path):
+            yield
+    
+    def append(self, row: List[Any]):
+        with self.locked():
+            self._open()
+            self._writer.writerow(row)
+            self._done_writing()
+    
+    def append_many(self, rows: List[List[Any]]):
+        """Append several rows with a single flush."""
+        with self.locked():
+            self._open()
+            self._writer.writerows(rows)
+            self._done_writing()
+    
+    def close(self):
+        """Close the file; the next append reopens it."""
+        with self._lock:
+            self._close()
+    
+    def replace_with(self, write: Callable[[Path], None]):
+        """
+        Atomically rewrite the log: write(tmp_path) produces the new contents,
+        which then replace the file. Appends wait until the swap is done.
+        """
+        with self.locked():
+            self._close()
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            write(tmp_path)
+            os.replace(tmp_path, self.path)
+    
+    def consume(self, fold: Callable[[Path], None]):
+        """
+        Hand the log to fold(path), then delete it, all under the lock so no
+        row appended in between is lost. Does nothing if the log is missing.
+        """
+        with self.locked():
+            if not self.path.exists():
+                return
+            fold(self.path)
+            self._close()
+            self.path.unlink()
+    
+    def _is_current(self) -> bool:
+        """True while the open handle is still the file at self.path."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        fst = os.fstat(self._file.fileno())
+        return (st.st_ino, st.st_dev) == (fst.st_ino, fst.st_dev)
+    
+    def _open(self):
+        if self._file is not None and not self._is_current():
+            self._close()
+        if self._file is None:
+            new_file = not self.path.exists() or self.path.stat().st_size == 0
+            self._file = open(self.path, 'a', newline='')
+            self._writer = csv.writer(self._file, lineterminator='\n')
+            if new_file:
+                self._writer.writerow(self.header)
+    
+    def _done_writing(self):
+        if os.name == 'nt':
+            self._close()
+        else:
+            self._file.flush()
+    
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+_csv_appenders: Dict[Path, CsvAppender] = {}
+_csv_appenders_lock = threading.Lock()
+
+
+def get_csv_appender(path: Path, header: List[str]) -> CsvAppender:
+    """Shared appender for a CSV log, opened lazily on first write."""
+    with _csv_appenders_lock:
+        appender = _csv_appenders.get(path)
+        if appender is None:
+            appender = _csv_appenders[path] = CsvAppender(path, header)
+        return appender
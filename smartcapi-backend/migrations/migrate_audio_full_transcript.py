@@ -0,0 +1,47 @@
+"""
+Migration: add audio_files.full_transcript.
+
+InferenceService stores the formatted transcript of an interview on its
+audio file when the segments are saved (app/model/tables.py AudioFile). The
+column is nullable: rows processed before it existed keep NULL, and
+InferenceService.generate_interview_summary rebuilds their transcript from the
+transcription_segments rows, so no backfill is needed.
+
+Usage:
+  python migrate_audio_full_transcript.py --database-url sqlite:///smartcapi.db
+  python migrate_audio_full_transcript.py --database-url sqlite:///smartcapi.db --apply
+
+Dry-run by default: prints what would happen without writing.
+"""
+import argparse
+from sqlalchemy import create_engine, MetaData, Table, Text, select, func, text
+
+TABLE_NAME = "audio_files"
+COLUMN_NAME = "full_transcript"
+
+def main(args):
+    engine = create_engine(args.database_url)
+    with engine.begin() as conn:
+        audio_files = Table(TABLE_NAME, MetaData(), autoload_with=conn)
+        if COLUMN_NAME in audio_files.c:
+            print(f"{TABLE_NAME}.{COLUMN_NAME} already exists; nothing to do.")
+            return
+
+        rows = conn.execute(select(func.count()).select_from(audio_files)).scalar()
+        print(f"{rows} existing audio files will have {COLUMN_NAME} = NULL "
+              f"(transcript rebuilt from their segments on read).")
+
+        if not args.apply:
+            print("Dry-run mode (no changes). Re-run with --apply to add the column.")
+            return
+
+        column_type = Text().compile(dialect=engine.dialect)
+        conn.execute(text(f"ALTER TABLE {TABLE_NAME} ADD COLUMN {COLUMN_NAME} {column_type}"))
+        print(f"Added {TABLE_NAME}.{COLUMN_NAME}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", required=True, help="SQLAlchemy database URL")
+    parser.add_argument("--apply", action="store_true", help="Apply changes (default is dry-run)")
+    args = parser.parse_args()
+    main(args)
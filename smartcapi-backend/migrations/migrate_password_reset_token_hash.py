@@ -0,0 +1,103 @@
+"""
+Migration: password_reset_tokens.token (plaintext) -> token_hash (SHA-256).
+
+app/model/tables.py stores reset tokens as token_hash = sha256(token), a
+unique 32-byte LargeBinary, instead of the plaintext token column. This script
+rebuilds the table in that shape.
+
+Outstanding tokens:
+- Expired rows are dropped; they could never be redeemed anyway.
+- Unexpired rows are carried over as sha256(token), so reset links that were
+  already e-mailed keep working until their normal expiry (one hour) while
+  the plaintext is removed from the database.
+- With --invalidate-outstanding every row is dropped instead; users then have
+  to request a new reset link. Use this if the plaintext tokens may have been
+  exposed.
+
+The table is read into memory, dropped and recreated in one transaction
+(portable across SQLite, PostgreSQL and MySQL, and there is at most one row
+per user). Nothing references password_reset_tokens, so row ids are not kept.
+
+Usage:
+  python migrate_password_reset_token_hash.py --database-url sqlite:///smartcapi.db
+  python migrate_password_reset_token_hash.py --database-url sqlite:///smartcapi.db --apply
+
+Dry-run by default: prints what would happen without writing.
+"""
+import argparse
+import hashlib
+from datetime import datetime
+from sqlalchemy import (create_engine, MetaData, Table, Column, Integer, DateTime,
+                        LargeBinary, ForeignKey, select)
+
+TABLE_NAME = "password_reset_tokens"
+
+def token_hash(token: str) -> bytes:
+    """Same digest as services.user_service._reset_token_hash."""
+    return hashlib.sha256(token.encode()).digest()
+
+def hashed_token_table(meta):
+    """password_reset_tokens as defined by app/model/tables.py after the change."""
+    return Table(
+        TABLE_NAME, meta,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("user_id", Integer, ForeignKey("users.id"), unique=True),
+        Column("token_hash", LargeBinary(32), unique=True, nullable=False),
+        Column("expires_at", DateTime, nullable=False),
+        Column("created_at", DateTime),
+    )
+
+def plan_rows(rows, now, invalidate_outstanding=False):
+    """New table rows for the legacy rows that stay valid."""
+    if invalidate_outstanding:
+        return []
+    return [
+        {
+            "user_id": row.user_id,
+            "token_hash": token_hash(row.token),
+            "expires_at": row.expires_at,
+            "created_at": row.created_at,
+        }
+        for row in rows
+        if row.token and row.expires_at is not None and row.expires_at > now
+    ]
+
+def main(args):
+    engine = create_engine(args.database_url)
+    with engine.begin() as conn:
+        legacy = Table(TABLE_NAME, MetaData(), autoload_with=conn)
+        if "token_hash" in legacy.c:
+            print(f"{TABLE_NAME} already stores token_hash; nothing to do.")
+            return
+        if "token" not in legacy.c:
+            raise SystemExit(f"{TABLE_NAME} has neither token nor token_hash; inspect it manually.")
+
+        rows = conn.execute(select(legacy)).fetchall()
+        # expires_at is written with datetime.utcnow() (services.user_service)
+        kept = plan_rows(rows, datetime.utcnow(), args.invalidate_outstanding)
+        print(f"Found {len(rows)} reset tokens: {len(kept)} carried over as hashes, "
+              f"{len(rows) - len(kept)} dropped.")
+
+        if not args.apply:
+            print("Dry-run mode (no changes). Re-run with --apply to rebuild the table.")
+            return
+
+        meta = MetaData()
+        # Needed to resolve the users.id foreign key
+        Table("users", meta, autoload_with=conn)
+        table = hashed_token_table(meta)
+
+        legacy.drop(conn)
+        table.create(conn)
+        if kept:
+            conn.execute(table.insert(), kept)
+        print(f"Rebuilt {TABLE_NAME} with token_hash.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", required=True, help="SQLAlchemy database URL")
+    parser.add_argument("--apply", action="store_true", help="Apply changes (default is dry-run)")
+    parser.add_argument("--invalidate-outstanding", action="store_true",
+                        help="Drop every existing reset token instead of hashing the unexpired ones")
+    args = parser.parse_args()
+    main(args)